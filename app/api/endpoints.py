@@ -1,17 +1,38 @@
-from fastapi import APIRouter, Body, File, UploadFile, Depends, HTTPException
-from typing import Optional, List
-from pydantic import ValidationError
+from fastapi import APIRouter, Body, File, UploadFile, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, Literal
+from datetime import date, datetime, timedelta
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 import csv
-import io
-from datetime import datetime
-from decimal import Decimal
+import json
+from app.api.export import MEDIA_TYPES, filter_orders, stream_orders
+from app.api.stats import MAX_DAILY_RANGE, daily_rollups, rollup_for
+from app.core.cache import order_cache
 from app.core.logging_config import logger
-from app.core.metrics import ingestion_total, ingestion_errors_total
-
-from app.database import get_db
-from app.schemas.order import OrderIngest, OrderCreate
+from app.core.metrics import ingestion_errors_total, ingest_request_failures_total
+from app.core.pagination import MAX_PAGE_SIZE, encode_cursor, decode_cursor
+
+from app.database import get_db, run_db
+from app.ingestion.instrumentation import timed_chunks, timed_reader
+from app.ingestion import (
+    DECOMPRESSION_ERRORS,
+    SpoolFull,
+    SpoolUnavailable,
+    SpoolWriteFailed,
+    iter_csv_records,
+    aiter_ndjson_batches,
+    open_decompressed,
+    aiter_decompressed,
+    ingest_records,
+    ingest_batches,
+    submit_job,
+)
 from app.models.orders import Order
+from app.models.ingest_jobs import IngestJob
+from app.schemas.ingest_job import IngestJobResponse
+from app.schemas.stats import RollupResponse
 
 
 router = APIRouter()
@@ -20,11 +41,31 @@ router = APIRouter()
 async def ingest_data(
     file: Optional[UploadFile] = File(None),
     data: Optional[List[dict]] = Body(None),
+    loader: Literal["copy", "staging", "orm"] = Query("copy"),
+    on_conflict: Literal["error", "skip", "update"] = Query("error"),
+    parallel: bool = Query(False),
+    chunk_size: Optional[int] = Query(None, gt=0),
+    spool: bool = Query(False),
     db: Session = Depends(get_db)
 ):
     """
-    Accepting CSV or JSON files, and using SQLAlchemy to perform batch insert open a DB session, inject it into an\
-    endpoint, and automatic close.
+    Accepting CSV or JSON data and batch inserting it with SQLAlchemy. CSV uploads are streamed: the file is
+    read and parsed incrementally and handed to validation and insert in fixed-size batches, so memory stays
+    flat regardless of the upload size. .csv.gz/.bz2/.xz uploads are detected from their content type or
+    leading bytes and decompressed on the fly.
+
+    loader picks how valid rows are written: "copy" streams them with COPY FROM STDIN, "staging" copies into a
+    temporary table and merges, and "orm" uses bulk_save_objects. on_conflict decides what happens to rows whose
+    order_id already exists: "error" fails the ingest, "skip" leaves the stored order alone and "update" overwrites
+    it. skip/update are written with multi-row INSERT ... ON CONFLICT unless loader is "staging". parallel
+    validates each batch on the shared process pool (INGEST_VALIDATION_WORKERS) when it is running.
+
+    chunk_size commits every chunk_size rows instead of once at the end; rows the database rejects (constraint
+    violations, numeric overflow) are isolated with savepoints and returned in errors while the rest commit.
+
+    spool appends valid rows to the local write-ahead log (ORDER_WAL_DIR) and answers once they are fsynced there;
+    the background drainer loads them, so the upload is accepted even while the database is slow or down. Spooled
+    duplicates are skipped rather than failing, as the rows were already acknowledged.
     """
 
     # ensuring either file or data is provided
@@ -33,127 +74,295 @@ async def ingest_data(
     if file and data:
         raise HTTPException(status_code=400, detail="Provide either CSV file or JSON data, not both")
 
-    # parse data
-    records = []
+    # parse data lazily, rows are only pulled as batches are processed
     if file:
-        #csv data
-        try:
-            contents = await file.read()
-            csv_text = contents.decode('utf8')
-            csv_read = csv.DictReader(io.StringIO(csv_text))
-            records = list(csv_reader)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error reading csv file: {str(e)}")
+        records = iter_csv_records(open_decompressed(timed_reader(file.file), file.content_type))
     else:
-        # JSON data
         records = data
 
+    try:
+        result = await run_db(
+            ingest_records,
+            db,
+            records,
+            loader=loader,
+            on_conflict=on_conflict,
+            parallel=parallel,
+            chunk_size=chunk_size,
+            spool=spool,
+        )
+
+    except (UnicodeDecodeError, csv.Error, *DECOMPRESSION_ERRORS) as e:
+        await run_db(db.rollback)
+        ingest_request_failures_total.labels("unreadable_input").inc()
+        raise HTTPException(status_code=400, detail=f"Error reading csv file: {str(e)}")
+
+    except SpoolUnavailable as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except SpoolFull as e:
+        await run_db(db.rollback)
+        ingest_request_failures_total.labels("spool_full").inc()
+        raise HTTPException(status_code=503, detail=str(e))
+
+    except SpoolWriteFailed as e:
+        # a local disk problem, not bad input: 507 when the disk is full, else retry later
+        await run_db(db.rollback)
+        ingest_request_failures_total.labels("spool_error").inc()
+        logger.error(f"Spooling ingest failed: {str(e)}")
+        raise HTTPException(status_code=507 if e.disk_full else 503, detail=str(e))
+
+    except Exception as e:
+        await run_db(db.rollback)
+        ingestion_errors_total.inc()
+        ingest_request_failures_total.labels("database").inc()
+        logger.error(f"Ingest failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    return result.as_response()
+
+
+@router.post("/ingest/ndjson")
+async def ingest_ndjson(
+    request: Request,
+    loader: Literal["copy", "staging", "orm"] = Query("copy"),
+    on_conflict: Literal["error", "skip", "update"] = Query("error"),
+    parallel: bool = Query(False),
+    chunk_size: Optional[int] = Query(None, gt=0),
+    spool: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    """
+    Ingest newline-delimited JSON orders from the raw request body. The body is consumed as it arrives and each
+    batch is written before more is read, so a slow database pushes back on the client instead of buffering.
+    gzip, bz2 and xz bodies are detected from their leading bytes or Content-Encoding and inflated as they stream.
+    """
+    compression_hint = request.headers.get("content-encoding") or request.headers.get("content-type")
+
+    try:
+        result = await ingest_batches(
+            db,
+            aiter_ndjson_batches(aiter_decompressed(timed_chunks(request.stream()), compression_hint)),
+            loader=loader,
+            on_conflict=on_conflict,
+            parallel=parallel,
+            chunk_size=chunk_size,
+            spool=spool,
+        )
+
+    except (ValueError, *DECOMPRESSION_ERRORS) as e:
+        await run_db(db.rollback)
+        ingest_request_failures_total.labels("unreadable_input").inc()
+        raise HTTPException(status_code=400, detail=f"Error reading ndjson body: {str(e)}")
+
+    except SpoolUnavailable as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except SpoolFull as e:
+        await run_db(db.rollback)
+        ingest_request_failures_total.labels("spool_full").inc()
+        raise HTTPException(status_code=503, detail=str(e))
+
+    except SpoolWriteFailed as e:
+        # a local disk problem, not bad input: 507 when the disk is full, else retry later
+        await run_db(db.rollback)
+        ingest_request_failures_total.labels("spool_error").inc()
+        logger.error(f"Spooling ingest failed: {str(e)}")
+        raise HTTPException(status_code=507 if e.disk_full else 503, detail=str(e))
+
+    except Exception as e:
+        await run_db(db.rollback)
+        ingestion_errors_total.inc()
+        ingest_request_failures_total.labels("database").inc()
+        logger.error(f"NDJSON ingest failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    return result.as_response()
+
+
+@router.post("/ingest/jobs", status_code=202, response_model=IngestJobResponse)
+async def create_ingest_job(
+    file: UploadFile = File(...),
+    loader: Literal["copy", "staging", "orm"] = Query("copy"),
+    on_conflict: Literal["error", "skip", "update"] = Query("error"),
+    chunk_size: Optional[int] = Query(None, gt=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Spool a CSV upload to local disk and process it in the background. Returns the queued job at once; poll
+    GET /ingest/jobs/{job_id} for progress.
+    """
+    logger.info(f"Ingest job requested for file: {file.filename}")
 
+    try:
+        job = await run_db(
+            submit_job,
+            db,
+            file.file,
+            filename=file.filename,
+            loader=loader,
+            on_conflict=on_conflict,
+            chunk_size=chunk_size,
+        )
+    except Exception as e:
+        logger.error(f"Failed to queue ingest job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Could not queue ingest job: {str(e)}")
 
-    # VALIDATION
-    valid_records = []
-    errors = []
+    return job
 
-    for idx, record in enumerate(records):
-        try:
-            order_ingest = OrderIngest(**record)
 
-            total_amount = Decimal(order_ingest.quantity) * order_ingest.price_per_unit
+@router.get("/ingest/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_ingest_job(job_id: str, db: Session = Depends(get_db)):
+    job = await run_db(db.get, IngestJob, job_id)
 
-            order_create = OrderCreate(**order_ingest.dict(), total_amount=total_amount)
+    if job is None:
+        logger.warning(f"Ingest job not found: {job_id}")
+        raise HTTPException(status_code=404, detail="Ingest job not found")
 
-            valid_records.append(order_create)
+    return job
 
-        except ValidationError as e:
-            errors.apend({"row": idx + 1, "data":record, "error":str(e)})
 
-        except ExceptionError as e: 
-            errors.apend({"row": idx + 1, "data":record, "error":f"unexpected error: {str(e)}"})
+@router.get("/orders")
+async def get_all_orders(response: Response,
+                        skip: int = Query(0, ge=0),
+                        limit: int = Query(10, ge=0, le=MAX_PAGE_SIZE),
+                        cursor: Optional[str] = None,
+                        customer_id: Optional[str] = None,
+                        status: Optional[str] = None,
+                        start_date: Optional[datetime] = None,
+                        end_date: Optional[datetime] = None,
+                        db: Session=Depends(get_db)):
+    """
+    List orders oldest first. Pages can be walked with skip/limit, or with keyset pagination: when more rows
+    follow, the X-Next-Cursor header holds a token to pass back as cursor. A cursor page costs the same index
+    range scan on (created_at, id) however deep it is, while skip makes PostgreSQL read and discard every
+    skipped row. start_date (inclusive) and end_date (exclusive) filter on order_date, which on a partitioned
+    orders table limits the scan to the matching monthly partitions.
+    """
+    logger.info(
+        f"Fetching orders - skip={skip}, limit={limit}, cursor={cursor}, customer_id={customer_id}, status={status}, "
+        f"start_date={start_date}, end_date={end_date}"
+    )
 
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="Use either cursor or skip, not both")
 
+    query = filter_orders(db.query(Order), customer_id, status, start_date, end_date)
 
-    # BATCH INSERT
-    inserted_count = 0
+    query = query.order_by(Order.created_at, Order.id)
 
-    if valid_records:
+    if cursor:
         try:
-            # Convert to database models
-            db_orders = [
-                Order(
-                    order_id=order.order_id,
-                    customer_id=order.customer_id,
-                    product_id=order.product_id,
-                    quantity=order.quantity,
-                    price_per_unit=order.price_per_unit,
-                    order_date=order.order_date,
-                    status=order.status,
-                    total_amount=order.total_amount,
-                    created_at=datetime.utcnow()
-                )
-                for order in valid_records
-            ]
-
-            # Batch insert
-            db.bulk_save_objects(db_orders)
-            db.commit()
-            inserted_count = len(db_orders)
-            ingestion_total.inc(inserted_count)
-
-        except Exception as e:
-            db.rollback()
-            raise HTTPException(
-                status_code=500,
-                detail=f"Database error: {str(e)}"
-                ingestion_errors_total.inc(len(errors))
-            )
-
-    # RETURN
-    return {
-        "status": "completed",
-        "total_submitted": len(records),
-        "successful": inserted_count,
-        "failed": len(errors),
-        "errors": errors[:10] if errors else []
-    }
-
-
-
+            after_created_at, after_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.filter(tuple_(Order.created_at, Order.id) > tuple_(after_created_at, after_id))
+    else:
+        query = query.offset(skip)
 
+    # one extra row tells whether another page follows
+    query = query.limit(limit + 1)
+    orders = await run_db(query.all)
 
-@router.get("/orders")
-async def get_all_orders(skip: int = 0,
-                        limit: int = 10,
-                        customer_id: Optional[str] = None,
-                        status: Optional[str] = None,
-                        db: Session=Depends(get_db)):
-    logger.info(f"Fetching orders - skip={skip}, limit={limit}, customer_id={customer_id}, status={status}")
+    if len(orders) > limit:
+        orders = orders[:limit]
+        # limit=0 asks for an empty page, there is no last row to continue from
+        if orders:
+            response.headers["X-Next-Cursor"] = encode_cursor(orders[-1].created_at, orders[-1].id)
 
-    query = db.query(Order)
+    logger.info(f"Retrieved {len(orders)} orders")
 
-    if customer_id:
-        query = query.filter(Order.customer_id == customer_id)
-        logger.debug(f"Filtering by customer_id: {customer_id}")
+    return orders
 
-    if status:
-        query = query.filter(Order.status == status)
-        logger.debug(f"Filtering by status: {status}")
 
-    orders = db.query(Order).offset(skip).limit(limit).all()
-    logger.info(f"Retrieved {len(orders)} orders")
 
-    return orders
+@router.get("/orders/export")
+async def export_orders(format: Literal["csv", "ndjson"] = "csv",
+                        customer_id: Optional[str] = None,
+                        status: Optional[str] = None,
+                        start_date: Optional[datetime] = None,
+                        end_date: Optional[datetime] = None):
+    """
+    Stream every matching order as CSV or NDJSON. Takes the GET /orders filters plus an order_date range
+    (start_date inclusive, end_date exclusive). Rows are read through a server-side cursor and sent as they
+    arrive, so memory stays constant and the first rows go out before the query finishes.
+    """
+    logger.info(
+        f"Exporting orders - format={format}, customer_id={customer_id}, status={status}, "
+        f"start_date={start_date}, end_date={end_date}"
+    )
 
+    return StreamingResponse(
+        stream_orders(format, customer_id, status, start_date, end_date),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'},
+    )
 
 
 @router.get("/orders/{order_id}")
-def get_order(order_id: str, db: Session = Depends(get_db)):
+async def get_order(order_id: str, db: Session = Depends(get_db)):
+    """
+    Fetch one order. Serialized responses are kept in a read-through LRU cache
+    (ORDER_CACHE_SIZE, ORDER_CACHE_TTL_SECONDS); misses are never cached.
+    """
     logger.info(f"Fetching order with ID: {order_id}")
 
-    order = db.query(Order).filter(Order.order_id == order_id).first()
+    cached = order_cache.get(order_id)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    token = order_cache.token()
+    # a partitioned orders table only keeps order_id unique per order_date, the
+    # first order written under an id is the one served and cached
+    query = db.query(Order).filter(Order.order_id == order_id).order_by(Order.created_at, Order.id)
+    order = await run_db(query.first)
 
     if order is None:
         logger.warning(f"Order not found: {order_id}")
         raise HTTPException(status_code=404, detail="Order not found")
 
+    body = json.dumps(jsonable_encoder(order), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    order_cache.set(order_id, body, token)
+
     logger.info(f"Order found: {order_id}")
-    return order
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/stats/customers/{customer_id}", response_model=RollupResponse)
+async def get_customer_stats(customer_id: str, db: Session = Depends(get_db)):
+    """Order count, quantity and revenue for one customer, read from the rollups instead of scanning orders."""
+    stats = await run_db(rollup_for, db, "customer", customer_id)
+
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No orders for customer")
+
+    return stats
+
+
+@router.get("/stats/products/{product_id}", response_model=RollupResponse)
+async def get_product_stats(product_id: str, db: Session = Depends(get_db)):
+    stats = await run_db(rollup_for, db, "product", product_id)
+
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No orders for product")
+
+    return stats
+
+
+@router.get("/stats/daily", response_model=List[RollupResponse])
+async def get_daily_stats(start_date: Optional[date] = None,
+                          end_date: Optional[date] = None,
+                          db: Session = Depends(get_db)):
+    """
+    Per-day totals by order_date, both ends inclusive. Defaults to the 30 days ending today; days without
+    orders are omitted.
+    """
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=29)
+
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    if (end_date - start_date).days >= MAX_DAILY_RANGE:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_DAILY_RANGE} days")
+
+    return await run_db(daily_rollups, db, start_date, end_date)
@@ -0,0 +1,128 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+
+from app.database import SessionLocal, run_db
+from app.models.orders import Order
+
+
+# rows fetched per round trip from the server-side cursor, and per chunk sent
+EXPORT_FETCH_SIZE = 5000
+
+EXPORT_COLUMNS = (
+    Order.order_id,
+    Order.customer_id,
+    Order.product_id,
+    Order.quantity,
+    Order.price_per_unit,
+    Order.total_amount,
+    Order.status,
+    Order.order_date,
+    Order.created_at,
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def filter_orders(
+    query,
+    customer_id: Optional[str] = None,
+    status: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+):
+    # works on both Query and select(); the date range is on order_date, end exclusive
+    if customer_id:
+        query = query.filter(Order.customer_id == customer_id)
+    if status:
+        query = query.filter(Order.status == status)
+    if start_date:
+        query = query.filter(Order.order_date >= start_date)
+    if end_date:
+        query = query.filter(Order.order_date < end_date)
+    return query
+
+
+def _fetch_partitions(statement, fetch_size: int) -> Iterator[Sequence]:
+    # a session of its own, the export outlives the request's dependencies
+    db = SessionLocal()
+    try:
+        # yield_per makes psycopg2 use a named server-side cursor
+        result = db.execute(statement.execution_options(yield_per=fetch_size))
+        yield from result.partitions()
+    finally:
+        db.close()
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        # as a string, so no precision is lost on the way
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _render_csv(rows: List[Sequence]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def _render_ndjson(rows: List[Sequence]) -> str:
+    names = [column.key for column in EXPORT_COLUMNS]
+    return "".join(json.dumps(dict(zip(names, row)), default=_json_default) + "\n" for row in rows)
+
+
+async def _close_partitions(fetch: Optional[asyncio.Future], partitions: Iterator[List[Sequence]]):
+    # the generator cannot be closed while a fetch is still running on a db thread
+    if fetch is not None and not fetch.done():
+        await asyncio.wait({fetch})
+    await run_db(partitions.close)
+
+
+async def stream_orders(
+    export_format: str,
+    customer_id: Optional[str] = None,
+    status: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    fetch_size: int = EXPORT_FETCH_SIZE,
+) -> AsyncIterator[str]:
+    """
+    Stream matching orders as CSV or NDJSON, one chunk per fetch from a
+    server-side cursor. Rows start flowing as soon as the first fetch returns
+    and memory is bounded by fetch_size whatever the result size.
+    """
+    statement = filter_orders(select(*EXPORT_COLUMNS), customer_id, status, start_date, end_date)
+    statement = statement.order_by(Order.created_at, Order.id)
+
+    render = _render_csv if export_format == "csv" else _render_ndjson
+    partitions = _fetch_partitions(statement, fetch_size)
+
+    fetch = None
+    try:
+        if export_format == "csv":
+            yield _render_csv([[column.key for column in EXPORT_COLUMNS]])
+
+        while True:
+            # shielded so a disconnect does not abandon a fetch mid-flight
+            fetch = asyncio.ensure_future(run_db(next, partitions, None))
+            rows = await asyncio.shield(fetch)
+            if rows is None:
+                break
+            yield render(rows)
+
+    finally:
+        # also runs when the client disconnects mid-export; shielded so a
+        # second cancellation cannot leave the cursor and session open
+        await asyncio.shield(_close_partitions(fetch, partitions))
@@ -0,0 +1,58 @@
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.rollups import OrderRollup, OrderRollupDelta
+
+
+# a daily range is answered with one rollup row per day, keep it bounded
+MAX_DAILY_RANGE = 366
+
+
+def _totals(dimension: str, key_filter):
+    # compacted totals plus deltas the compactor has not folded in yet, so
+    # reads are exact without waiting for the next compaction
+    rows = union_all(
+        *(
+            select(
+                model.key,
+                model.order_count,
+                model.total_quantity,
+                model.total_revenue,
+            ).where(model.dimension == dimension, key_filter(model.key))
+            for model in (OrderRollup, OrderRollupDelta)
+        )
+    ).subquery()
+    return (
+        select(
+            rows.c.key,
+            func.sum(rows.c.order_count).label("order_count"),
+            func.sum(rows.c.total_quantity).label("total_quantity"),
+            func.sum(rows.c.total_revenue).label("total_revenue"),
+        )
+        .group_by(rows.c.key)
+        .having(func.sum(rows.c.order_count) > 0)
+        .order_by(rows.c.key)
+    )
+
+
+def _as_dict(dimension: str, row) -> dict:
+    return {
+        "dimension": dimension,
+        "key": row.key,
+        "order_count": row.order_count,
+        "total_quantity": row.total_quantity,
+        "total_revenue": row.total_revenue,
+    }
+
+
+def rollup_for(db: Session, dimension: str, key: str) -> Optional[dict]:
+    row = db.execute(_totals(dimension, lambda column: column == key)).first()
+    return _as_dict(dimension, row) if row is not None else None
+
+
+def daily_rollups(db: Session, start_date: date, end_date: date) -> List[dict]:
+    query = _totals("day", lambda column: column.between(start_date.isoformat(), end_date.isoformat()))
+    return [_as_dict("day", row) for row in db.execute(query)]
@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from app.core.metrics import (
+    order_cache_hits_total,
+    order_cache_misses_total,
+    order_cache_evictions_total,
+    order_cache_entries,
+    order_cache_bytes,
+)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache of serialized responses with a per-entry TTL and
+    limits on both entry count and total bytes.
+
+    Readers that miss take a token() before querying the database and pass it
+    to set(); if the key was invalidated in the meantime the stale value is
+    dropped instead of being cached.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, tombstones: int = 10000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._cleared_at = 0
+        # newest invalidation whose tombstone was evicted, older tokens can no longer be checked per key
+        self._evicted_at = -1
+        # key -> epoch of its last invalidation, bounded like the cache itself
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._tombstones = tombstones
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def token(self) -> int:
+        return self._epoch
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                self._remove(key, "expired")
+                entry = None
+            if entry is None:
+                order_cache_misses_total.inc()
+                return None
+            self._entries.move_to_end(key)
+        order_cache_hits_total.inc()
+        return entry[0]
+
+    def set(self, key: str, value: bytes, token: Optional[int] = None):
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if token is not None and (
+                token < self._cleared_at or token <= self._evicted_at or self._invalidated.get(key, -1) > token
+            ):
+                # changed while the caller was loading it
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)), "capacity")
+            self._update_gauges()
+
+    def invalidate(self, keys: Iterable[str]):
+        with self._lock:
+            self._epoch += 1
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+                self._invalidated[key] = self._epoch
+                self._invalidated.move_to_end(key)
+            while len(self._invalidated) > self._tombstones:
+                _, epoch = self._invalidated.popitem(last=False)
+                self._evicted_at = max(self._evicted_at, epoch)
+            self._update_gauges()
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._cleared_at = self._epoch
+            self._entries.clear()
+            self._invalidated.clear()
+            self._bytes = 0
+            self._update_gauges()
+
+    def _remove(self, key: str, reason: Optional[str] = None):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+        if reason is not None:
+            order_cache_evictions_total.labels(reason=reason).inc()
+
+    def _update_gauges(self):
+        order_cache_entries.set(len(self._entries))
+        order_cache_bytes.set(self._bytes)
+
+
+# GET /orders/{order_id} responses. ORDER_CACHE_SIZE=0 turns the cache off
+order_cache = LRUCache(
+    max_entries=int(os.getenv("ORDER_CACHE_SIZE", "10000")),
+    max_bytes=int(os.getenv("ORDER_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+    ttl=float(os.getenv("ORDER_CACHE_TTL_SECONDS", "30")),
+)
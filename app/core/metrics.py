@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
 
 ingestion_total = Counter("ingestion_total", "Total number of successful ingestions")
 
@@ -6,8 +6,140 @@ ingestion_errors_total = Counter(
     "ingestion_errors_total", "Total number of failed ingestions"
 )
 
+# rows rejected by ingests that completed; ingestion_errors_total counts failed requests
+ingestion_rows_rejected_total = Counter(
+    "ingestion_rows_rejected_total", "Rows rejected by completed ingestions"
+)
+
+# labelled by normalized statement, see app/database/instrumentation.py
 database_query_duration_seconds = Histogram(
-    "database_query_duration_seconds", "Database query duration in seconds"
+    "database_query_duration_seconds",
+    "Database query duration in seconds",
+    ["statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
 )
 
 orders_created_total = Counter("orders_created_total", "Total number of orders created")
+
+order_cache_hits_total = Counter("order_cache_hits_total", "Order lookups served from the cache")
+
+order_cache_misses_total = Counter("order_cache_misses_total", "Order lookups that missed the cache")
+
+order_cache_evictions_total = Counter(
+    "order_cache_evictions_total", "Entries dropped from the order cache", ["reason"]
+)
+
+order_cache_entries = Gauge("order_cache_entries", "Entries currently in the order cache")
+
+order_cache_bytes = Gauge("order_cache_bytes", "Bytes of serialized orders held in the order cache")
+
+order_wal_append_seconds = Histogram(
+    "order_wal_append_seconds", "Time to append and fsync a record to the order write-ahead log"
+)
+
+order_wal_pending_bytes = Gauge("order_wal_pending_bytes", "Bytes in the order write-ahead log not yet drained")
+
+order_wal_segments = Gauge("order_wal_segments", "Segment files held by the order write-ahead log")
+
+order_wal_drain_lag_seconds = Gauge(
+    "order_wal_drain_lag_seconds", "Age of the newest record in the last drained write-ahead log batch"
+)
+
+order_wal_drained_rows_total = Counter("order_wal_drained_rows_total", "Rows replayed from the write-ahead log")
+
+order_wal_rejected_rows_total = Counter(
+    "order_wal_rejected_rows_total", "Write-ahead log rows the database rejected while draining"
+)
+
+order_wal_quarantined_bytes_total = Counter(
+    "order_wal_quarantined_bytes_total",
+    "Write-ahead log bytes moved to quarantine after a corrupt record, acknowledged orders may be among them",
+)
+
+events_received_total = Counter("events_received_total", "Events accepted into the event buffer")
+
+events_written_total = Counter("events_written_total", "Events written to the events table")
+
+events_dropped_total = Counter("events_dropped_total", "Events that were not stored", ["reason"])
+
+events_buffered = Gauge("events_buffered", "Events waiting in the buffer to be flushed")
+
+events_flush_duration_seconds = Histogram(
+    "events_flush_duration_seconds", "Time to write one buffered batch of events"
+)
+
+# payloads range from a few bytes to multi-GB uploads
+_SIZE_BUCKETS = tuple(10**exponent for exponent in range(2, 11))
+
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "Request latency until the response is fully sent", ["method", "route", "status"]
+)
+
+http_requests_in_progress = Gauge("http_requests_in_progress", "Requests currently being handled", ["method"])
+
+http_request_size_bytes = Histogram(
+    "http_request_size_bytes", "Request body size", ["method", "route"], buckets=_SIZE_BUCKETS
+)
+
+http_response_size_bytes = Histogram(
+    "http_response_size_bytes", "Response body size", ["method", "route"], buckets=_SIZE_BUCKETS
+)
+
+ingest_stage_duration_seconds = Histogram(
+    "ingest_stage_duration_seconds",
+    "Time spent per ingest batch in each stage: read, parse, validate, build, insert, commit",
+    ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+ingest_batch_rows = Histogram(
+    "ingest_batch_rows", "Rows per ingest batch", buckets=(1, 10, 100, 500, 1000, 2500, 5000, 10000)
+)
+
+ingest_rows_per_second = Gauge("ingest_rows_per_second", "Rows per second of the last completed ingest", ["loader"])
+
+ingest_row_errors_total = Counter("ingest_row_errors_total", "Rejected ingest rows by error type", ["type"])
+
+ingest_request_failures_total = Counter(
+    "ingest_request_failures_total", "Ingest requests that failed as a whole, by reason", ["reason"]
+)
+
+db_pool_checked_out = Gauge("db_pool_checked_out", "Pooled database connections currently checked out")
+
+db_pool_idle = Gauge("db_pool_idle", "Open database connections waiting in the pool")
+
+db_pool_overflow = Gauge("db_pool_overflow", "Open database connections beyond pool_size")
+
+db_pool_capacity = Gauge("db_pool_capacity", "Most connections the pool may open: pool_size plus max_overflow")
+
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool, including opening a new one",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+db_pool_checkout_timeouts_total = Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after waiting pool_timeout for a connection"
+)
+
+db_pool_checkout_duration_seconds = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "How long a connection is held per checkout",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+
+db_pool_connections_opened_total = Counter("db_pool_connections_opened_total", "Database connections opened by the pool")
+
+db_pool_connection_lifetime_seconds = Histogram(
+    "db_pool_connection_lifetime_seconds",
+    "Age of pooled database connections when they are closed",
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200, 21600, 86400),
+)
+
+db_heartbeat_up = Gauge("db_heartbeat_up", "1 if the last database heartbeat succeeded, else 0")
+
+db_heartbeat_latency_seconds = Gauge("db_heartbeat_latency_seconds", "Round trip of the last database heartbeat")
+
+db_heartbeat_last_success_timestamp = Gauge(
+    "db_heartbeat_last_success_timestamp", "Unix time of the last successful database heartbeat"
+)
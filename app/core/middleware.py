@@ -0,0 +1,66 @@
+import time
+
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    http_request_size_bytes,
+    http_response_size_bytes,
+)
+
+
+# requests that matched no route share one label so stray paths cannot blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware recording latency, in-flight requests and body sizes
+    per route template (/orders/{order_id}, not the concrete path). Bodies are
+    counted as they stream, so uploads and exports are measured without being
+    buffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        received = 0
+        sent = 0
+        status = 500
+
+        async def counting_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal sent, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+
+            # the router stores the matched route in the scope on its way in
+            route = scope.get("route")
+            route = getattr(route, "path", None) or UNMATCHED_ROUTE
+
+            http_request_duration_seconds.labels(method, route, str(status)).observe(elapsed)
+            http_request_size_bytes.labels(method, route).observe(received)
+            http_response_size_bytes.labels(method, route).observe(sent)
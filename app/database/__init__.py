@@ -1,4 +1,30 @@
 from app.database.base import Base
-from app.database.session import get_db, engine, SessionLocal
+from app.database.session import get_db, engine, SessionLocal, dedicated_connection
+from app.database.executor import run_db, shutdown_db_executor
+from app.database.group_commit import GroupCommitter, group_commit_from_env
+from app.database.partitions import maintain_partitions, partition_maintainer_from_env
+from app.database.rollups import compact_rollups, rollup_compactor_from_env
+from app.database.invalidation import invalidate_orders, invalidation_listener_from_env
+from app.database.pool import pool_sizer_from_env
+from app.database.heartbeat import DatabaseHeartbeat, database_heartbeat_from_env
 
-__all__ = ["Base", "get_db", "engine", "SessionLocal"]
+__all__ = [
+    "Base",
+    "get_db",
+    "engine",
+    "SessionLocal",
+    "dedicated_connection",
+    "run_db",
+    "shutdown_db_executor",
+    "GroupCommitter",
+    "group_commit_from_env",
+    "maintain_partitions",
+    "partition_maintainer_from_env",
+    "compact_rollups",
+    "rollup_compactor_from_env",
+    "invalidate_orders",
+    "invalidation_listener_from_env",
+    "pool_sizer_from_env",
+    "DatabaseHeartbeat",
+    "database_heartbeat_from_env",
+]
@@ -0,0 +1,31 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from app.database.session import POOL_MAX_CONNECTIONS
+
+
+T = TypeVar("T")
+
+# one thread per pooled connection: more threads would only queue on the pool,
+# fewer would leave connections idle while requests wait. sized for the largest
+# the pool can get, idle threads cost nothing when adaptive sizing keeps it smaller
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", POOL_MAX_CONNECTIONS))
+
+_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run blocking database work on the dedicated database threads so async
+    endpoints never block the event loop. Kept separate from the default
+    threadpool so slow queries cannot starve file reads and sync endpoints.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+def shutdown_db_executor():
+    _executor.shutdown(wait=True)
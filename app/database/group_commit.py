@@ -0,0 +1,157 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import logger
+
+
+_STOP = object()
+
+
+class GroupCommitter:
+    """
+    Coalesces single-row inserts from concurrent requests into one multi-row
+    INSERT ... RETURNING and one commit. A group is flushed when it reaches
+    max_rows or window seconds after its first row arrived. Each caller gets
+    its own returned row, or its own exception if that row was rejected.
+    """
+
+    def __init__(
+        self,
+        table,
+        session_factory: Callable[[], Session],
+        key: str,
+        window: float = 0.002,
+        max_rows: int = 500,
+    ):
+        self._table = table
+        self._session_factory = session_factory
+        self._key = key
+        self._window = window
+        self._max_rows = max_rows
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"group-commit-{self._table.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        # rows already queued are still written before the thread exits
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, values: dict) -> Future:
+        future: Future = Future()
+        self._queue.put((values, future))
+        return future
+
+    async def insert(self, values: dict) -> dict:
+        return await asyncio.wrap_future(self.submit(values))
+
+    def _collect(self, first) -> Tuple[List, bool]:
+        group = [first]
+        deadline = time.monotonic() + self._window
+
+        while len(group) < self._max_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return group, True
+            group.append(item)
+
+        return group, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            group, stopping = self._collect(item)
+            self._flush(group)
+
+        # drain whatever arrived after the stop request
+        leftovers = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                leftovers.append(item)
+        if leftovers:
+            self._flush(leftovers)
+
+    def _flush(self, group: List):
+        statement = insert(self._table).returning(*self._table.c)
+        db = self._session_factory()
+        try:
+            try:
+                returned = db.execute(statement.values([values for values, _ in group])).mappings().all()
+                db.commit()
+                by_key = {row[self._key]: dict(row) for row in returned}
+                for values, future in group:
+                    future.set_result(by_key[values[self._key]])
+                return
+
+            except DBAPIError as e:
+                db.rollback()
+                logger.warning(f"Group insert of {len(group)} rows failed, retrying row by row: {str(e.orig)}")
+
+            # isolate the rows the database rejects so they fail on their own
+            outcomes = []
+            for values, future in group:
+                try:
+                    with db.begin_nested():
+                        row = db.execute(statement.values(values)).mappings().one()
+                    outcomes.append((future, dict(row), None))
+                except DBAPIError as e:
+                    outcomes.append((future, None, e))
+            db.commit()
+
+            for future, row, error in outcomes:
+                if error is None:
+                    future.set_result(row)
+                else:
+                    future.set_exception(error)
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Group insert of {len(group)} rows failed: {str(e)}")
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+
+        finally:
+            db.close()
+
+
+def group_commit_from_env(table, session_factory: Callable[[], Session], key: str) -> Optional[GroupCommitter]:
+    # opt-in, ORDER_GROUP_COMMIT=1 turns it on
+    if os.getenv("ORDER_GROUP_COMMIT", "0").lower() not in ("1", "true", "yes"):
+        return None
+    return GroupCommitter(
+        table,
+        session_factory,
+        key,
+        window=float(os.getenv("ORDER_GROUP_COMMIT_WINDOW_MS", "2")) / 1000,
+        max_rows=int(os.getenv("ORDER_GROUP_COMMIT_MAX_ROWS", "500")),
+    )
@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+from datetime import datetime, UTC
+from typing import Optional
+
+from app.core.logging_config import logger
+from app.core.metrics import db_heartbeat_last_success_timestamp, db_heartbeat_latency_seconds, db_heartbeat_up
+from app.database.session import engine, dedicated_connection
+
+
+HEARTBEAT_INTERVAL = float(os.getenv("DB_HEARTBEAT_INTERVAL_SECONDS", "2"))
+# /ready fails when the last heartbeat failed, when the last success is older than this
+HEARTBEAT_MAX_AGE = float(os.getenv("DB_HEARTBEAT_MAX_AGE_SECONDS", str(3 * HEARTBEAT_INTERVAL)))
+# and while this share of the pool's capacity is checked out
+READY_MAX_POOL_SATURATION = float(os.getenv("DB_READY_MAX_POOL_SATURATION", "1.0"))
+
+
+class DatabaseHeartbeat:
+    """
+    Background thread that runs SELECT 1 every interval seconds on its own
+    connection, opened outside the pool so a saturated pool cannot delay it
+    and probes never take connections from requests. Health endpoints read
+    the recorded state instead of querying the database.
+    """
+
+    def __init__(self, interval: float, max_age: float, max_pool_saturation: float):
+        self._interval = interval
+        self._max_age = max_age
+        self._max_pool_saturation = max_pool_saturation
+        self._conn = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.healthy: Optional[bool] = None
+        self.latency: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[datetime] = None
+        self._last_success: Optional[float] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="db-heartbeat", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self._close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.beat()
+            self._stop.wait(self._interval)
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def beat(self):
+        started = time.perf_counter()
+        try:
+            if self._conn is None:
+                self._conn = dedicated_connection()
+            cur = self._conn.cursor()
+            cur.execute("SELECT 1;")
+            cur.fetchone()
+            cur.close()
+            self._conn.rollback()
+        except Exception as e:
+            # reconnect on the next beat, the connection may be what broke
+            self._close()
+            if self.healthy is not False:
+                logger.error(f"Database heartbeat failed: {str(e)}")
+            self.healthy, self.error = False, str(e)
+            db_heartbeat_up.set(0)
+        else:
+            if self.healthy is False:
+                logger.info("Database heartbeat recovered")
+            self.healthy, self.error = True, None
+            self._last_success = time.monotonic()
+            db_heartbeat_up.set(1)
+            db_heartbeat_last_success_timestamp.set(time.time())
+        finally:
+            self.latency = time.perf_counter() - started
+            self.checked_at = datetime.now(UTC)
+            db_heartbeat_latency_seconds.set(self.latency)
+
+    def last_success_age(self) -> Optional[float]:
+        return time.monotonic() - self._last_success if self._last_success is not None else None
+
+    def status(self) -> dict:
+        """Last heartbeat result and current pool usage, without touching the database."""
+        pool = engine.pool
+        capacity = pool.size() + max(0, pool._max_overflow)
+        checked_out = pool.checkedout()
+        age = self.last_success_age()
+        return {
+            "database": {True: "healthy", False: "unhealthy", None: "unknown"}[self.healthy],
+            "detail": self.error,
+            "latency_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+            "last_success_age_seconds": round(age, 3) if age is not None else None,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "pool": {
+                "checked_out": checked_out,
+                "capacity": capacity,
+                "saturation": round(checked_out / capacity, 3) if capacity else 1.0,
+            },
+        }
+
+    def ready(self, status: dict) -> Optional[str]:
+        """Reason the replica should not take traffic, or None when it should."""
+        age = status["last_success_age_seconds"]
+        if status["database"] == "unknown":
+            return "database not reached yet"
+        if status["database"] == "unhealthy":
+            return f"database heartbeat failed: {status['detail']}"
+        # a heartbeat stuck on a hung connection never records a failure, only its age grows
+        if age > self._max_age:
+            return f"last successful database heartbeat {age:.1f}s ago"
+        if status["pool"]["saturation"] >= self._max_pool_saturation:
+            return "connection pool saturated"
+        return None
+
+
+def database_heartbeat_from_env() -> DatabaseHeartbeat:
+    return DatabaseHeartbeat(HEARTBEAT_INTERVAL, HEARTBEAT_MAX_AGE, READY_MAX_POOL_SATURATION)
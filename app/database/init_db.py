@@ -1,8 +1,20 @@
 from app.database.session import engine
 from app.database.base import Base
+from app.database.partitions import maintain_partitions
+from app.database.rollups import install_rollup_triggers
 
 
 def init_db():
-    from app.models import Order
+    from app.models import Order, IngestJob, OrderRollup, OrderRollupDelta, Event
+    from app.models.orders import ORDERS_PARTITIONED
 
+    # an existing unpartitioned orders table is left as is, migrating it means
+    # creating the partitioned table under a new name and copying rows over
     Base.metadata.create_all(bind=engine)
+
+    if ORDERS_PARTITIONED:
+        with engine.begin() as conn:
+            maintain_partitions(conn)
+
+    with engine.begin() as conn:
+        install_rollup_triggers(conn)
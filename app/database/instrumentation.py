@@ -0,0 +1,77 @@
+import re
+import threading
+import time
+import zlib
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import database_query_duration_seconds
+
+
+# distinct statement labels kept before new ones are folded into "other"
+MAX_FINGERPRINTS = 500
+FINGERPRINT_LENGTH = 200
+
+_NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\s+"), " "),
+    # IN lists and multi-row VALUES collapse to one placeholder group
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),
+    (re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+"), "(?)"),
+    # ORM select and insert column lists say little and would eat the length budget
+    (re.compile(r"^SELECT (?:DISTINCT )?.+? FROM ", re.IGNORECASE), "SELECT ... FROM "),
+    (re.compile(r"^INSERT INTO (\w+) \([^)]*\)", re.IGNORECASE), r"INSERT INTO \1 (...)"),
+)
+
+_seen = set()
+_seen_lock = threading.Lock()
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Statement with literals and parameters replaced, so every call of one query shares a label."""
+    statement = statement.strip()
+    for pattern, replacement in _NORMALIZE:
+        statement = pattern.sub(replacement, statement)
+    if len(statement) > FINGERPRINT_LENGTH:
+        # keep truncated statements that differ only past the cut apart
+        statement = f"{statement[:FINGERPRINT_LENGTH]}... #{zlib.crc32(statement.encode()):08x}"
+
+    with _seen_lock:
+        if statement not in _seen:
+            if len(_seen) >= MAX_FINGERPRINTS:
+                return "other"
+            _seen.add(statement)
+    return statement
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    database_query_duration_seconds.labels(fingerprint(statement)).observe(time.perf_counter() - started)
+
+
+def _handle_error(context):
+    # failed statements are timed too, they are often the slow ones
+    conn = context.connection
+    if conn is not None and conn.info.get("query_started") and context.statement is not None:
+        started = conn.info["query_started"].pop()
+        database_query_duration_seconds.labels(fingerprint(context.statement)).observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine):
+    """
+    Time every statement executed through SQLAlchemy. COPY and execute_values
+    on the raw psycopg2 cursor bypass these hooks and are covered by the
+    ingest metrics instead.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,127 @@
+import json
+import os
+import select
+import threading
+from typing import Optional, Sequence
+
+import psycopg2
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.core.cache import order_cache
+from app.core.logging_config import logger
+from app.database.session import dedicated_connection
+
+
+# cross-replica invalidation over LISTEN/NOTIFY, off unless ORDER_CACHE_NOTIFY is set
+NOTIFY_ENABLED = os.getenv("ORDER_CACHE_NOTIFY", "").lower() in ("1", "true", "yes")
+NOTIFY_CHANNEL = os.getenv("ORDER_CACHE_NOTIFY_CHANNEL", "order_cache_invalidate")
+
+# NOTIFY payloads are capped at 8000 bytes, bigger writes just flush every cache
+MAX_NOTIFY_IDS = 200
+FLUSH_ALL = "*"
+
+_RECONNECT_DELAY = 5.0
+
+# session.info key of the order ids to drop from the local cache when the transaction ends
+_PENDING = "invalidated_order_ids"
+
+
+def invalidate_orders(db: Session, order_ids: Sequence[str]):
+    """
+    Drop order_ids from this process's cache once the caller's transaction
+    ends and, when notifications are enabled, queue a NOTIFY on it so other
+    replicas drop them once (and only if) it commits. Dropping them any
+    earlier would let a concurrent read cache the old row until the TTL.
+    """
+    if not order_cache.enabled or not order_ids:
+        return
+    db.info.setdefault(_PENDING, set()).update(order_ids)
+    if NOTIFY_ENABLED:
+        payload = json.dumps(list(order_ids)) if len(order_ids) <= MAX_NOTIFY_IDS else FLUSH_ALL
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFY_CHANNEL, "payload": payload})
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _invalidate_after_transaction(session: Session, transaction):
+    # savepoints end inside the outer transaction, only its end makes the write visible.
+    # a rollback invalidates too, an extra cache miss is harmless
+    if transaction.parent is None:
+        order_ids = session.info.pop(_PENDING, None)
+        if order_ids:
+            order_cache.invalidate(order_ids)
+
+
+class InvalidationListener:
+    """
+    Background thread holding a dedicated (unpooled) connection that LISTENs on
+    the invalidation channel and applies notifications to the local cache.
+    The cache is flushed after every reconnect since notifications sent while
+    disconnected are lost.
+    """
+
+    def __init__(self, channel: str):
+        self._channel = channel
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _connect(self):
+        conn = dedicated_connection()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f'LISTEN "{self._channel}"')
+        except psycopg2.Error:
+            conn.close()
+            raise
+        return conn
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                conn = self._connect()
+            except psycopg2.Error as e:
+                logger.warning(f"Cache invalidation listener could not connect: {str(e)}")
+                self._stop.wait(_RECONNECT_DELAY)
+                continue
+
+            order_cache.clear()
+            logger.info(f"Listening for cache invalidations on {self._channel}")
+            try:
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._apply(conn.notifies.pop(0).payload)
+            except (psycopg2.Error, OSError) as e:
+                logger.warning(f"Cache invalidation listener lost its connection: {str(e)}")
+            finally:
+                conn.close()
+
+    def _apply(self, payload: str):
+        if payload == FLUSH_ALL:
+            order_cache.clear()
+            return
+        try:
+            order_cache.invalidate(json.loads(payload))
+        except ValueError:
+            order_cache.clear()
+
+
+def invalidation_listener_from_env() -> Optional[InvalidationListener]:
+    if not NOTIFY_ENABLED or not order_cache.enabled:
+        return None
+    return InvalidationListener(NOTIFY_CHANNEL)
@@ -0,0 +1,164 @@
+import os
+import re
+from datetime import UTC, date, datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from app.core.logging_config import logger
+from app.database.periodic import PeriodicTask
+from app.database.session import engine
+
+
+# months of partitions created ahead of the current one
+PARTITION_PREMAKE_MONTHS = int(os.getenv("ORDERS_PARTITION_PREMAKE_MONTHS", "3"))
+
+# months kept including the current one, 0 keeps every partition
+PARTITION_RETENTION_MONTHS = int(os.getenv("ORDERS_PARTITION_RETENTION_MONTHS", "0"))
+
+# expired partitions are detached (kept as standalone tables) or dropped
+PARTITION_EXPIRY = os.getenv("ORDERS_PARTITION_EXPIRY", "detach")
+
+PARTITION_MAINTENANCE_INTERVAL = float(os.getenv("ORDERS_PARTITION_MAINTENANCE_HOURS", "6")) * 3600
+
+DEFAULT_PARTITION = "orders_default"
+
+# adding or detaching a partition locks orders, give up instead of queueing
+# every writer behind a long-running ingest
+_LOCK_TIMEOUT = "5s"
+
+_PARTITION_NAME = re.compile(r"^orders_p(\d{4})(\d{2})$")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"orders_p{month:%Y%m}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'orders'::regclass")
+    ).first() is not None
+
+
+def maintain_partitions(conn: Connection, today: Optional[date] = None):
+    """
+    Create the monthly partitions of orders from the retention window through
+    PARTITION_PREMAKE_MONTHS ahead, and detach or drop the ones that fell out
+    of the window. Rows outside every monthly partition land in orders_default;
+    each run moves them into partitions of their own month, so historic and
+    backfilled orders are split and expired like the rest. Expiring a partition
+    does not fire delete triggers, so rollups keep counting the expired orders.
+    """
+    if not is_partitioned(conn):
+        logger.warning("orders is not a partitioned table, skipping partition maintenance")
+        return
+    # only one replica runs maintenance at a time
+    if not conn.execute(text("SELECT pg_try_advisory_xact_lock(hashtext('orders_partitions'))")).scalar():
+        return
+    conn.execute(text(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'"))
+
+    current = (today or datetime.now(UTC).date()).replace(day=1)
+    first = _add_months(current, 1 - PARTITION_RETENTION_MONTHS) if PARTITION_RETENTION_MONTHS else current
+
+    attached = set(
+        conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'orders'::regclass"
+            )
+        ).scalars()
+    )
+
+    if DEFAULT_PARTITION not in attached:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF orders DEFAULT"))
+
+    parked = [
+        month
+        for month in conn.execute(
+            text(f"SELECT DISTINCT date_trunc('month', order_date)::date FROM {DEFAULT_PARTITION} ORDER BY 1")
+        ).scalars()
+        if partition_name(month) not in attached
+    ]
+    if parked and _split_default(conn, parked):
+        attached.update(partition_name(month) for month in parked)
+
+    month = first
+    while month <= _add_months(current, PARTITION_PREMAKE_MONTHS):
+        name = partition_name(month)
+        if name not in attached:
+            try:
+                with conn.begin_nested():
+                    conn.execute(
+                        text(
+                            f"CREATE TABLE {name} PARTITION OF orders "
+                            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+                        )
+                    )
+                logger.info(f"Created orders partition {name}")
+            except DBAPIError as e:
+                logger.warning(f"Could not create orders partition {name}: {str(e)}")
+        month = _add_months(month, 1)
+
+    if not PARTITION_RETENTION_MONTHS:
+        return
+
+    for name in sorted(attached):
+        match = _PARTITION_NAME.match(name)
+        if match is None or date(int(match[1]), int(match[2]), 1) >= first:
+            continue
+        try:
+            with conn.begin_nested():
+                conn.execute(text(f"ALTER TABLE orders DETACH PARTITION {name}"))
+                if PARTITION_EXPIRY == "drop":
+                    conn.execute(text(f"DROP TABLE {name}"))
+            logger.info(f"Expired orders partition {name} ({PARTITION_EXPIRY})")
+        except DBAPIError as e:
+            logger.warning(f"Could not expire orders partition {name}: {str(e)}")
+
+
+def _split_default(conn: Connection, months: List[date]) -> bool:
+    # a month cannot get a partition while its rows sit in the default one, so
+    # detach the default, give each month its partition, move the rows over and
+    # attach it again. the rows are written to the partitions directly, which
+    # does not fire the statement triggers on orders, so rollups are unchanged
+    try:
+        with conn.begin_nested():
+            conn.execute(text(f"ALTER TABLE orders DETACH PARTITION {DEFAULT_PARTITION}"))
+            for month in months:
+                name = partition_name(month)
+                bounds = f"order_date >= '{month.isoformat()}' AND order_date < '{_add_months(month, 1).isoformat()}'"
+                conn.execute(
+                    text(
+                        f"CREATE TABLE {name} PARTITION OF orders "
+                        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+                    )
+                )
+                moved = conn.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {bounds}")).rowcount
+                conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {bounds}"))
+                logger.info(f"Created orders partition {name} with {moved} rows moved from {DEFAULT_PARTITION}")
+            conn.execute(text(f"ALTER TABLE orders ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+        return True
+    except DBAPIError as e:
+        # retried on the next run, the rows stay in the default partition meanwhile
+        logger.warning(f"Could not move rows out of {DEFAULT_PARTITION}: {str(e)}")
+        return False
+
+
+def _maintain():
+    with engine.begin() as conn:
+        maintain_partitions(conn)
+
+
+def partition_maintainer_from_env() -> Optional[PeriodicTask]:
+    from app.models.orders import ORDERS_PARTITIONED
+
+    if not ORDERS_PARTITIONED or PARTITION_MAINTENANCE_INTERVAL <= 0:
+        return None
+    return PeriodicTask("orders-partition-maintenance", PARTITION_MAINTENANCE_INTERVAL, _maintain)
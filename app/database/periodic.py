@@ -0,0 +1,49 @@
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy.exc import DBAPIError
+
+from app.core.logging_config import logger
+
+
+class PeriodicTask:
+    """
+    Background thread that runs func every interval seconds. Errors are logged
+    and retried on the next tick, so one bad run never ends the thread; stop()
+    runs func one last time when final_run is set.
+    """
+
+    def __init__(self, name: str, interval: float, func: Callable[[], None], final_run: bool = False):
+        self.name = name
+        self._interval = interval
+        self._func = func
+        self._final_run = final_run
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            stopping = self._stop.wait(self._interval)
+            if stopping and not self._final_run:
+                return
+            try:
+                self._func()
+            except DBAPIError as e:
+                logger.warning(f"{self.name} failed: {str(e)}")
+            except Exception as e:
+                # pool timeouts, pending rollbacks and bugs alike, keep ticking
+                logger.error(f"{self.name} failed unexpectedly: {type(e).__name__}: {str(e)}")
+            if stopping:
+                return
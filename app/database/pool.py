@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.core.logging_config import logger
+from app.core.metrics import (
+    db_pool_capacity,
+    db_pool_checked_out,
+    db_pool_checkout_duration_seconds,
+    db_pool_checkout_timeouts_total,
+    db_pool_checkout_wait_seconds,
+    db_pool_connection_lifetime_seconds,
+    db_pool_connections_opened_total,
+    db_pool_idle,
+    db_pool_overflow,
+)
+from app.database.periodic import PeriodicTask
+
+
+# checkout waits kept between two PoolSizer ticks
+_WAIT_SAMPLES = 10_000
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times every checkout and keeps recent waits and the peak
+    number of checked out connections for the PoolSizer. max_overflow can be
+    changed while connections are in use.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._waits = deque(maxlen=_WAIT_SAMPLES)
+        self._peak_checked_out = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            db_pool_checkout_timeouts_total.inc()
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            db_pool_checkout_wait_seconds.observe(waited)
+            self._waits.append(waited)
+
+        checked_out = self.checkedout()
+        if checked_out > self._peak_checked_out:
+            self._peak_checked_out = checked_out
+        return conn
+
+    def capacity(self) -> int:
+        return self.size() + self._max_overflow
+
+    def set_capacity(self, connections: int):
+        # overflow connections above the new limit are closed as they are checked in
+        self._max_overflow = max(0, connections - self.size())
+
+    def take_checkout_stats(self) -> Tuple[List[float], int]:
+        """Waits and peak checked out connections since the last call."""
+        with self._stats_lock:
+            waits = list(self._waits)
+            self._waits.clear()
+            peak, self._peak_checked_out = self._peak_checked_out, self.checkedout()
+        return waits, peak
+
+
+def _on_connect(dbapi_connection, connection_record):
+    connection_record.info["opened_at"] = time.monotonic()
+    db_pool_connections_opened_total.inc()
+
+
+def _on_close(dbapi_connection, connection_record):
+    opened_at = connection_record.info.pop("opened_at", None)
+    if opened_at is not None:
+        db_pool_connection_lifetime_seconds.observe(time.monotonic() - opened_at)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checked_out_at"] = time.perf_counter()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    checked_out_at = connection_record.info.pop("checked_out_at", None)
+    if checked_out_at is not None:
+        db_pool_checkout_duration_seconds.observe(time.perf_counter() - checked_out_at)
+
+
+def instrument_pool(engine: Engine):
+    """
+    Export pool occupancy gauges and connection hold time and lifetime
+    histograms. Checkout waits are timed by InstrumentedQueuePool itself.
+    """
+    event.listen(engine.pool, "connect", _on_connect)
+    event.listen(engine.pool, "close", _on_close)
+    event.listen(engine.pool, "checkout", _on_checkout)
+    event.listen(engine.pool, "checkin", _on_checkin)
+
+    # read at scrape time from engine.pool, which dispose() replaces
+    db_pool_checked_out.set_function(lambda: engine.pool.checkedout())
+    db_pool_idle.set_function(lambda: engine.pool.checkedin())
+    db_pool_overflow.set_function(lambda: max(0, engine.pool.overflow()))
+    db_pool_capacity.set_function(lambda: engine.pool.size() + max(0, engine.pool._max_overflow))
+
+
+class PoolSizer:
+    """
+    Moves the pool's max_overflow between min_connections and max_connections:
+    one step up when the p95 checkout wait since the last tick is above
+    target_wait, one step down when waits are well below it and the peak in
+    use left at least a step of headroom.
+    """
+
+    def __init__(self, engine: Engine, min_connections: int, max_connections: int, target_wait: float, step: int = 2):
+        self._engine = engine
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.target_wait = target_wait
+        self.step = step
+
+    def adjust(self) -> Optional[int]:
+        pool = self._engine.pool
+        if not isinstance(pool, InstrumentedQueuePool):
+            return None
+
+        waits, peak = pool.take_checkout_stats()
+        capacity = pool.capacity()
+        p95 = sorted(waits)[int(len(waits) * 0.95)] if waits else 0.0
+
+        if p95 > self.target_wait and capacity < self.max_connections:
+            resized = min(self.max_connections, capacity + self.step)
+        elif p95 < self.target_wait / 4 and peak <= capacity - self.step and capacity > self.min_connections:
+            resized = max(self.min_connections, capacity - self.step)
+        else:
+            return None
+
+        pool.set_capacity(resized)
+        logger.info(
+            f"Database pool resized from {capacity} to {resized} connections "
+            f"(p95 checkout wait {p95 * 1000:.1f}ms, peak in use {peak})"
+        )
+        return resized
+
+
+def pool_sizer_from_env() -> Optional[PeriodicTask]:
+    from app.database.session import (
+        engine,
+        POOL_ADAPTIVE,
+        POOL_ADAPTIVE_INTERVAL,
+        POOL_ADAPTIVE_STEP,
+        POOL_ADAPTIVE_TARGET_WAIT,
+        POOL_MIN_CONNECTIONS,
+        POOL_MAX_CONNECTIONS,
+    )
+
+    if not POOL_ADAPTIVE:
+        return None
+    sizer = PoolSizer(engine, POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS, POOL_ADAPTIVE_TARGET_WAIT, POOL_ADAPTIVE_STEP)
+    return PeriodicTask("db-pool-sizer", POOL_ADAPTIVE_INTERVAL, sizer.adjust)
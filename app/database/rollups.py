@@ -0,0 +1,118 @@
+import os
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.logging_config import logger
+from app.database.periodic import PeriodicTask
+from app.database.session import SessionLocal
+
+
+ROLLUP_COMPACT_INTERVAL = float(os.getenv("ROLLUP_COMPACT_INTERVAL_SECONDS", "5"))
+
+# the dimensions each order is counted under, as (dimension, key) pairs of a row alias r
+_DIMENSIONS = (
+    "VALUES ('customer', r.customer_id), ('product', r.product_id), ('day', to_char(r.order_date, 'YYYY-MM-DD'))"
+)
+
+_LOG_ROWS = f"""
+    INSERT INTO order_rollup_deltas (dimension, key, order_count, total_quantity, total_revenue)
+    SELECT d.dimension, d.key, {{sign}} * count(*), {{sign}} * sum(r.quantity), {{sign}} * sum(r.total_amount)
+    FROM {{rows}} r CROSS JOIN LATERAL ({_DIMENSIONS}) AS d(dimension, key)
+    GROUP BY d.dimension, d.key;
+"""
+
+# statement-level triggers see every row of a COPY or multi-row INSERT at once
+# through transition tables, so each statement appends a handful of aggregated
+# deltas instead of touching the hot rollup rows inside the writer's transaction
+_TRIGGER_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION order_rollup_log() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {_LOG_ROWS.format(sign=1, rows="new_rows")}
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {_LOG_ROWS.format(sign=-1, rows="old_rows")}
+    END IF;
+    RETURN NULL;
+END
+$$;
+"""
+
+_TRIGGERS = (
+    """CREATE TRIGGER order_rollup_insert AFTER INSERT ON orders
+       REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION order_rollup_log()""",
+    """CREATE TRIGGER order_rollup_update AFTER UPDATE ON orders
+       REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION order_rollup_log()""",
+    """CREATE TRIGGER order_rollup_delete AFTER DELETE ON orders
+       REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION order_rollup_log()""",
+)
+
+_BACKFILL = f"""
+    INSERT INTO order_rollups (dimension, key, order_count, total_quantity, total_revenue, updated_at)
+    SELECT d.dimension, d.key, count(*), sum(r.quantity), sum(r.total_amount), now()
+    FROM orders r CROSS JOIN LATERAL ({_DIMENSIONS}) AS d(dimension, key)
+    GROUP BY d.dimension, d.key
+"""
+
+_COMPACT = """
+    WITH moved AS (
+        DELETE FROM order_rollup_deltas
+        RETURNING dimension, key, order_count, total_quantity, total_revenue
+    )
+    INSERT INTO order_rollups AS r (dimension, key, order_count, total_quantity, total_revenue, updated_at)
+    SELECT dimension, key, sum(order_count), sum(total_quantity), sum(total_revenue), now()
+    FROM moved
+    GROUP BY dimension, key
+    ON CONFLICT (dimension, key) DO UPDATE SET
+        order_count = r.order_count + excluded.order_count,
+        total_quantity = r.total_quantity + excluded.total_quantity,
+        total_revenue = r.total_revenue + excluded.total_revenue,
+        updated_at = excluded.updated_at
+"""
+
+
+def install_rollup_triggers(conn: Connection):
+    """
+    Create the change-log triggers on orders. The first time they are
+    installed the rollups are rebuilt from the existing orders, with writers
+    blocked so no order is counted twice or missed.
+    """
+    # replicas starting together install one after the other; without the lock both
+    # see no trigger and the second fails on CREATE TRIGGER or CREATE OR REPLACE FUNCTION
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('order_rollup_triggers'))"))
+    conn.execute(text(_TRIGGER_FUNCTION))
+    installed = conn.execute(
+        text("SELECT 1 FROM pg_trigger WHERE tgname = 'order_rollup_insert' AND tgrelid = 'orders'::regclass")
+    ).first()
+    if installed:
+        return
+
+    conn.execute(text("LOCK TABLE orders IN SHARE ROW EXCLUSIVE MODE"))
+    conn.execute(text("TRUNCATE order_rollups, order_rollup_deltas"))
+    for trigger in _TRIGGERS:
+        conn.execute(text(trigger))
+    conn.execute(text(_BACKFILL))
+    logger.info("Installed order rollup triggers and rebuilt rollups")
+
+
+def compact_rollups():
+    """Fold pending deltas into order_rollups."""
+    with SessionLocal() as db:
+        # only one replica folds the change log at a time
+        if not db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext('order_rollups'))")).scalar():
+            return
+        touched = db.execute(text(_COMPACT)).rowcount
+        db.commit()
+
+    if touched:
+        logger.debug(f"Compacted order rollups - rows={touched}")
+
+
+def rollup_compactor_from_env() -> Optional[PeriodicTask]:
+    # ROLLUP_COMPACT_INTERVAL_SECONDS=0 leaves compaction to another replica.
+    # a clean shutdown compacts once more so nothing is left pending
+    if ROLLUP_COMPACT_INTERVAL <= 0:
+        return None
+    return PeriodicTask("rollup-compactor", ROLLUP_COMPACT_INTERVAL, compact_rollups, final_run=True)
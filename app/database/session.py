@@ -4,14 +4,45 @@ from sqlalchemy.orm import Session, sessionmaker
 from typing import Generator
 from dotenv import load_dotenv
 
+from app.database.instrumentation import instrument_engine
+from app.database.pool import InstrumentedQueuePool, instrument_pool
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+
+# with DB_POOL_ADAPTIVE set, max_overflow is moved at runtime so the pool holds
+# between DB_POOL_MIN_CONNECTIONS and DB_POOL_MAX_CONNECTIONS connections,
+# growing while checkouts wait longer than DB_POOL_TARGET_WAIT_MS
+POOL_ADAPTIVE = os.getenv("DB_POOL_ADAPTIVE", "").lower() in ("1", "true", "yes")
+POOL_MIN_CONNECTIONS = max(POOL_SIZE, int(os.getenv("DB_POOL_MIN_CONNECTIONS", POOL_SIZE)))
+POOL_MAX_CONNECTIONS = (
+    max(POOL_MIN_CONNECTIONS, int(os.getenv("DB_POOL_MAX_CONNECTIONS", 2 * (POOL_SIZE + MAX_OVERFLOW))))
+    if POOL_ADAPTIVE
+    else POOL_SIZE + MAX_OVERFLOW
+)
+POOL_ADAPTIVE_TARGET_WAIT = float(os.getenv("DB_POOL_TARGET_WAIT_MS", "20")) / 1000
+POOL_ADAPTIVE_INTERVAL = float(os.getenv("DB_POOL_ADAPTIVE_INTERVAL_SECONDS", "10"))
+POOL_ADAPTIVE_STEP = int(os.getenv("DB_POOL_ADAPTIVE_STEP", "2"))
+
 engine = create_engine(
-    DATABASE_URL, pool_size=5, max_overflow=10, pool_recycle=3600, pool_pre_ping=True
+    DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_timeout=POOL_TIMEOUT,
+    pool_recycle=POOL_RECYCLE,
+    pool_pre_ping=True,
 )
 
+instrument_engine(engine)
+instrument_pool(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -21,3 +52,14 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def dedicated_connection():
+    """
+    psycopg2 connection opened with the engine's URL but outside its pool,
+    for long-lived sessions such as LISTEN and the health heartbeat: opening
+    it never waits on a saturated pool or takes a slot from requests. The
+    caller closes it.
+    """
+    cargs, cparams = engine.dialect.create_connect_args(engine.url)
+    return engine.dialect.connect(*cargs, **cparams)
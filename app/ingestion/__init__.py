@@ -0,0 +1,39 @@
+from app.ingestion.streaming import iter_csv_records, iter_batches, aiter_ndjson_batches
+from app.ingestion.compression import DECOMPRESSION_ERRORS, open_decompressed, aiter_decompressed
+from app.ingestion.loaders import LOADERS, ORDER_COLUMNS, resolve_loader
+from app.ingestion.validation import ValidatedBatch, validate_batch
+from app.ingestion.parallel import start_validation_pool, shutdown_validation_pool, validate_parallel
+from app.ingestion.write_ahead import SpoolFull, SpoolUnavailable, SpoolWriteFailed, get_order_wal, wal_drainer_from_env
+from app.ingestion.events import EventBuffer, event_buffer_from_env
+from app.ingestion.pipeline import IngestResult, ingest_records, ingest_batches
+from app.ingestion.jobs import submit_job, recover_jobs, shutdown_workers
+
+__all__ = [
+    "iter_csv_records",
+    "iter_batches",
+    "aiter_ndjson_batches",
+    "DECOMPRESSION_ERRORS",
+    "open_decompressed",
+    "aiter_decompressed",
+    "LOADERS",
+    "ORDER_COLUMNS",
+    "resolve_loader",
+    "ValidatedBatch",
+    "validate_batch",
+    "start_validation_pool",
+    "shutdown_validation_pool",
+    "validate_parallel",
+    "SpoolFull",
+    "SpoolUnavailable",
+    "SpoolWriteFailed",
+    "get_order_wal",
+    "wal_drainer_from_env",
+    "EventBuffer",
+    "event_buffer_from_env",
+    "IngestResult",
+    "ingest_records",
+    "ingest_batches",
+    "submit_job",
+    "recover_jobs",
+    "shutdown_workers",
+]
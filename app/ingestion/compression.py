@@ -0,0 +1,139 @@
+import bz2
+import gzip
+import io
+import lzma
+import zlib
+from typing import AsyncIterator, BinaryIO, Optional
+
+
+# longest decompressed piece produced from one compressed chunk, so a small,
+# highly compressed chunk cannot expand into one huge buffer
+MAX_INFLATE_SIZE = 1024 * 1024
+
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+)
+
+# content types and content encodings that name a compression format
+_HINTS = {
+    "application/gzip": "gzip",
+    "application/x-gzip": "gzip",
+    "gzip": "gzip",
+    "x-gzip": "gzip",
+    "application/x-bzip2": "bz2",
+    "application/x-bzip": "bz2",
+    "bzip2": "bz2",
+    "application/x-xz": "xz",
+    "xz": "xz",
+}
+
+_MAGIC_LENGTH = max(len(magic) for magic, _ in _MAGIC)
+
+# raised while reading corrupt or truncated compressed input
+DECOMPRESSION_ERRORS = (OSError, EOFError, zlib.error, lzma.LZMAError)
+
+
+def detect_compression(head: bytes, content_type: Optional[str] = None) -> Optional[str]:
+    # the leading bytes win, a declared type is only used when they are inconclusive
+    for magic, kind in _MAGIC:
+        if head.startswith(magic):
+            return kind
+    if content_type:
+        return _HINTS.get(content_type.split(";")[0].strip().lower())
+    return None
+
+
+def open_decompressed(stream: BinaryIO, content_type: Optional[str] = None) -> BinaryIO:
+    """
+    Return a file object yielding the decompressed bytes of a gzip, bz2 or xz
+    stream, or the stream itself when it is not compressed. Decompression
+    happens as the result is read, the input is never buffered whole.
+    """
+    if stream.seekable():
+        position = stream.tell()
+        head = stream.read(_MAGIC_LENGTH)
+        stream.seek(position)
+    else:
+        stream = io.BufferedReader(stream)
+        head = stream.peek(_MAGIC_LENGTH)[:_MAGIC_LENGTH]
+
+    kind = detect_compression(head, content_type)
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if kind == "bz2":
+        return bz2.BZ2File(stream, mode="rb")
+    if kind == "xz":
+        return lzma.LZMAFile(stream, mode="rb")
+    return stream
+
+
+def _decompressor(kind: str):
+    if kind == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if kind == "bz2":
+        return bz2.BZ2Decompressor()
+    return lzma.LZMADecompressor()
+
+
+def _inflate(decompressor, data: bytes):
+    # zlib keeps unread input in unconsumed_tail, bz2/lzma buffer it internally
+    # and report needs_input once they want more
+    piece = decompressor.decompress(data, MAX_INFLATE_SIZE)
+    yield piece
+    if isinstance(decompressor, (bz2.BZ2Decompressor, lzma.LZMADecompressor)):
+        while not decompressor.eof and not decompressor.needs_input:
+            yield decompressor.decompress(b"", MAX_INFLATE_SIZE)
+    else:
+        while decompressor.unconsumed_tail:
+            yield decompressor.decompress(decompressor.unconsumed_tail, MAX_INFLATE_SIZE)
+
+
+async def aiter_decompressed(chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> AsyncIterator[bytes]:
+    """
+    Async counterpart of open_decompressed for request bodies: detects the
+    format from the first bytes (or content_type) and inflates chunk by chunk.
+    Concatenated members, as written by e.g. pigz or pbzip2, are followed.
+    """
+    head = b""
+    kind = None
+    decompressor = None
+
+    async for chunk in chunks:
+        if decompressor is None and kind is None:
+            head += chunk
+            if len(head) < _MAGIC_LENGTH:
+                continue
+            chunk, head = head, b""
+            kind = detect_compression(chunk, content_type) or ""
+            if kind:
+                decompressor = _decompressor(kind)
+
+        if decompressor is None:
+            yield chunk
+            continue
+
+        while chunk:
+            if decompressor.eof:
+                # the previous member ended, possibly exactly on the last chunk's edge.
+                # bz2 and lzma raise EOFError when fed past the end of a stream
+                decompressor = _decompressor(kind)
+            for piece in _inflate(decompressor, chunk):
+                if piece:
+                    yield piece
+            chunk = decompressor.unused_data if decompressor.eof else b""
+
+    if head:
+        # body shorter than the longest magic number
+        kind = detect_compression(head, content_type)
+        if not kind:
+            yield head
+            return
+        decompressor = _decompressor(kind)
+        for piece in _inflate(decompressor, head):
+            if piece:
+                yield piece
+
+    if decompressor is not None and not decompressor.eof:
+        raise ValueError(f"Compressed {kind} body ended unexpectedly")
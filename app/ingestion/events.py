@@ -0,0 +1,192 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import UTC, datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import psycopg2
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import logger
+from app.core.metrics import (
+    events_received_total,
+    events_written_total,
+    events_dropped_total,
+    events_buffered,
+    events_flush_duration_seconds,
+)
+from app.ingestion.loaders import copy_into, naive_utc
+from app.ingestion.savepoints import load_isolating
+from app.models.events import Event
+
+
+EVENT_COLUMNS = ("event_id", "event_type", "user_id", "payload", "occurred_at", "received_at")
+
+# errors caused by the data itself, anything else is treated as the database being unavailable
+_DATA_ERRORS = (psycopg2.DataError, psycopg2.IntegrityError)
+
+_MAX_BACKOFF = 30.0
+
+
+def event_row(event, received_at: datetime) -> Tuple:
+    return (
+        event.event_id,
+        event.event_type,
+        event.user_id,
+        json.dumps(event.payload, ensure_ascii=False, separators=(",", ":")),
+        naive_utc(event.occurred_at),
+        naive_utc(received_at),
+    )
+
+
+def _copy_events(db: Session, rows: Sequence[Tuple]) -> Tuple[int, int]:
+    copy_into(db, Event.__tablename__, rows, EVENT_COLUMNS)
+    return len(rows), 0
+
+
+class EventBuffer:
+    """
+    Bounded in-memory buffer between the event endpoints and the events table.
+    A flusher thread COPYs everything buffered once flush_rows events are
+    waiting or flush_interval seconds after the oldest one arrived. When the
+    buffer is full, offer() refuses the events so callers can push back.
+    Buffered events are lost if the process dies before they are flushed.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        capacity: int = 100_000,
+        flush_rows: int = 5000,
+        flush_interval: float = 0.2,
+    ):
+        self._session_factory = session_factory
+        self._capacity = capacity
+        self._flush_rows = flush_rows
+        self._flush_interval = flush_interval
+        self._events: deque = deque()
+        self._oldest = 0.0
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="event-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        # whatever is buffered is flushed before the thread exits
+        if self._thread is not None:
+            with self._lock:
+                self._stopping = True
+                self._ready.notify()
+            self._thread.join()
+            self._thread = None
+
+    def offer(self, events: Sequence) -> bool:
+        """Buffer all of events or none of them, False when there is no room."""
+        received_at = datetime.now(UTC)
+        rows = [event_row(event, received_at) for event in events]
+        with self._lock:
+            if len(self._events) + len(rows) > self._capacity:
+                events_dropped_total.labels(reason="buffer_full").inc(len(rows))
+                return False
+            # wake the flusher to start the interval on the first event, and again when a batch is full
+            first = not self._events
+            if first:
+                self._oldest = time.monotonic()
+            self._events.extend(rows)
+            if first or len(self._events) >= self._flush_rows:
+                self._ready.notify()
+            events_buffered.set(len(self._events))
+        events_received_total.inc(len(rows))
+        return True
+
+    def _take(self) -> Tuple[List[Tuple], bool]:
+        with self._lock:
+            while not self._stopping:
+                if len(self._events) >= self._flush_rows:
+                    break
+                if self._events:
+                    remaining = self._oldest + self._flush_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._ready.wait(remaining)
+                else:
+                    self._ready.wait()
+            batch = list(self._events)
+            self._events.clear()
+            events_buffered.set(0)
+            return batch, self._stopping
+
+    def _requeue(self, batch: List[Tuple]):
+        # keep arrival order and never grow past capacity, the oldest overflow is dropped
+        with self._lock:
+            room = self._capacity - len(self._events)
+            if room < len(batch):
+                events_dropped_total.labels(reason="buffer_full").inc(len(batch) - room)
+                batch = batch[len(batch) - room :] if room > 0 else []
+            self._events.extendleft(reversed(batch))
+            if self._events:
+                self._oldest = time.monotonic()
+            events_buffered.set(len(self._events))
+
+    def _run(self):
+        backoff = 0.5
+        while True:
+            batch, stopping = self._take()
+            if batch:
+                try:
+                    self._flush(batch)
+                    backoff = 0.5
+                except Exception as e:
+                    logger.warning(f"Event flush of {len(batch)} events failed, retrying in {backoff:.1f}s: {str(e)}")
+                    if stopping:
+                        events_dropped_total.labels(reason="shutdown").inc(len(batch))
+                        return
+                    self._requeue(batch)
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, _MAX_BACKOFF)
+                    continue
+            if stopping:
+                return
+
+    def _flush(self, batch: List[Tuple]):
+        started = time.perf_counter()
+        db = self._session_factory()
+        try:
+            try:
+                _copy_events(db, batch)
+                db.commit()
+                written = len(batch)
+            except _DATA_ERRORS as e:
+                # one malformed event (e.g. a NUL in its payload) must not block the rest
+                db.rollback()
+                logger.warning(f"Event batch rejected, isolating bad events: {str(e).strip()}")
+                written, _, rejected = load_isolating(db, _copy_events, batch, range(len(batch)))
+                db.commit()
+                events_dropped_total.labels(reason="rejected").inc(len(rejected))
+        except (DBAPIError, psycopg2.Error):
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        events_written_total.inc(written)
+        events_flush_duration_seconds.observe(time.perf_counter() - started)
+        logger.debug(f"Flushed {written} events")
+
+
+def event_buffer_from_env(session_factory: Callable[[], Session]) -> EventBuffer:
+    return EventBuffer(
+        session_factory,
+        capacity=int(os.getenv("EVENT_BUFFER_CAPACITY", "100000")),
+        flush_rows=int(os.getenv("EVENT_FLUSH_ROWS", "5000")),
+        flush_interval=float(os.getenv("EVENT_FLUSH_INTERVAL_MS", "200")) / 1000,
+    )
@@ -0,0 +1,106 @@
+import io
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, BinaryIO, Iterator, Optional, TypeVar
+
+from app.core.metrics import ingest_stage_duration_seconds, ingest_row_errors_total
+
+
+T = TypeVar("T")
+
+READ_BUFFER_SIZE = 64 * 1024
+
+_PYDANTIC_ERROR_TYPE = re.compile(r"\[type=(\w+)")
+
+
+class StageClock:
+    """Seconds spent reading input during the current ingest, so parsing can be timed apart from it."""
+
+    def __init__(self):
+        self.read = 0.0
+
+
+_clock: ContextVar[Optional[StageClock]] = ContextVar("ingest_stage_clock", default=None)
+
+
+def observe_stage(stage: str, seconds: float):
+    ingest_stage_duration_seconds.labels(stage).observe(seconds)
+
+
+@contextmanager
+def timed_stage(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+@contextmanager
+def stage_clock() -> Iterator[StageClock]:
+    clock = StageClock()
+    token = _clock.set(clock)
+    try:
+        yield clock
+    finally:
+        _clock.reset(token)
+
+
+def _add_read(seconds: float):
+    clock = _clock.get()
+    if clock is not None:
+        clock.read += seconds
+
+
+class _TimedRaw(io.RawIOBase):
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return self._stream.seekable()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._stream.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._stream.tell()
+
+    def readinto(self, buffer) -> int:
+        started = time.perf_counter()
+        data = self._stream.read(len(buffer))
+        _add_read(time.perf_counter() - started)
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def timed_reader(stream: BinaryIO) -> BinaryIO:
+    """Wrap an upload so time spent reading it counts as the read stage. Closing the wrapper leaves stream open."""
+    return io.BufferedReader(_TimedRaw(stream), buffer_size=READ_BUFFER_SIZE)
+
+
+async def timed_chunks(chunks: AsyncIterator[T]) -> AsyncIterator[T]:
+    # time spent waiting on the client counts as the read stage
+    iterator = chunks.__aiter__()
+    while True:
+        started = time.perf_counter()
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            _add_read(time.perf_counter() - started)
+        yield chunk
+
+
+def record_row_error(error: str):
+    if error.startswith("database error"):
+        error_type = "database"
+    else:
+        match = _PYDANTIC_ERROR_TYPE.search(error)
+        error_type = match.group(1) if match else "invalid"
+    ingest_row_errors_total.labels(error_type).inc()
@@ -0,0 +1,243 @@
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, UTC
+from typing import BinaryIO, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import logger
+from app.core.metrics import ingest_request_failures_total
+from app.database.session import SessionLocal
+from app.ingestion.compression import open_decompressed
+from app.ingestion.instrumentation import timed_reader
+from app.ingestion.pipeline import IngestResult, ingest_records
+from app.ingestion.streaming import iter_csv_records
+from app.models.ingest_jobs import IngestJob
+
+
+# uploads are copied here as received, compressed or not, and processed from
+# disk, never held in memory
+SPOOL_DIR = os.getenv("INGEST_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "ingest-jobs"))
+
+# at most this many jobs run at once per replica, the rest wait in the queue
+JOB_WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "2"))
+
+# unfinished jobs whose upload is not in this replica's spool directory are
+# marked failed by recover_jobs once they are this old, they may still be
+# running on another replica until then
+JOB_STALE_SECONDS = float(os.getenv("INGEST_JOB_STALE_SECONDS", str(24 * 3600)))
+
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+# attempts at recording a job's final status before leaving it to recover_jobs
+FINISH_ATTEMPTS = 3
+
+_UNFINISHED = ("queued", "running")
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="ingest-job")
+
+
+def _now() -> datetime:
+    return datetime.now(UTC)
+
+
+def _spool(stream: BinaryIO, job_id: str) -> str:
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    path = os.path.join(SPOOL_DIR, f"{job_id}.upload")
+    with open(path, "wb") as spool_file:
+        shutil.copyfileobj(stream, spool_file, SPOOL_CHUNK_SIZE)
+    return path
+
+
+def _update_job(job_id: str, **values):
+    # progress goes through its own short transaction so other replicas can
+    # see it while the ingest transaction is still open
+    db = SessionLocal()
+    try:
+        db.query(IngestJob).filter(IngestJob.id == job_id).update(values)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _progress_values(result: IngestResult) -> dict:
+    return {
+        "rows_parsed": result.total_submitted,
+        "rows_validated": result.total_submitted - result.failed,
+        "rows_inserted": result.inserted,
+        "rows_updated": result.updated,
+        "rows_skipped": result.skipped,
+        "rows_failed": result.failed,
+    }
+
+
+def _report_progress(job_id: str, result: IngestResult):
+    # a missed progress update must not fail the job itself
+    try:
+        _update_job(job_id, **_progress_values(result))
+    except Exception as e:
+        logger.warning(f"Could not record progress for ingest job {job_id}: {str(e)}")
+
+
+def _record_outcome(job_id: str, values: dict) -> bool:
+    # the spool file is only removed once the job has a final status, so a job
+    # that cannot be marked finished is picked up by recover_jobs on restart
+    for attempt in range(FINISH_ATTEMPTS):
+        try:
+            _update_job(job_id, **values)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not record {values['status']} status of ingest job {job_id}: {str(e)}")
+            time.sleep(2**attempt)
+    logger.error(f"Ingest job {job_id} left {values['status']} but unrecorded, its upload is kept for recovery")
+    return False
+
+
+def run_job(job_id: str, path: str, loader: str, on_conflict: str, chunk_size: Optional[int] = None):
+    logger.info(f"Ingest job {job_id} started")
+
+    db = SessionLocal()
+    try:
+        _update_job(job_id, status="running", started_at=_now())
+
+        with open(path, "rb") as spool_file:
+            result = ingest_records(
+                db,
+                iter_csv_records(open_decompressed(timed_reader(spool_file))),
+                loader=loader,
+                on_conflict=on_conflict,
+                # background jobs are the large uploads, use the pool when it runs
+                parallel=True,
+                chunk_size=chunk_size,
+                on_batch=lambda progress: _report_progress(job_id, progress),
+            )
+
+        outcome = dict(status="completed", finished_at=_now(), errors=result.errors, **_progress_values(result))
+        logger.info(f"Ingest job {job_id} completed")
+
+    except Exception as e:
+        db.rollback()
+        ingest_request_failures_total.labels("job").inc()
+        logger.error(f"Ingest job {job_id} failed: {str(e)}")
+        outcome = dict(status="failed", finished_at=_now(), error=str(e))
+
+    finally:
+        db.close()
+
+    if _record_outcome(job_id, outcome):
+        os.remove(path)
+
+
+def submit_job(
+    db: Session,
+    stream: BinaryIO,
+    filename: Optional[str] = None,
+    loader: str = "copy",
+    on_conflict: str = "error",
+    chunk_size: Optional[int] = None,
+) -> IngestJob:
+    """
+    Spool an upload to local disk, record a queued job and hand it to the
+    worker pool. Returns as soon as the job row is committed.
+    """
+    job_id = uuid.uuid4().hex
+    path = _spool(stream, job_id)
+
+    job = IngestJob(
+        id=job_id,
+        status="queued",
+        filename=filename,
+        loader=loader,
+        on_conflict=on_conflict,
+        chunk_size=chunk_size,
+    )
+    try:
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+    except Exception:
+        db.rollback()
+        os.remove(path)
+        raise
+
+    _executor.submit(run_job, job_id, path, loader, on_conflict, chunk_size)
+    logger.info(f"Ingest job {job_id} queued for {filename}")
+    return job
+
+
+def _age(job: IngestJob) -> float:
+    since = (job.started_at or job.created_at).replace(tzinfo=None)
+    return (_now().replace(tzinfo=None) - since).total_seconds()
+
+
+def recover_jobs() -> dict:
+    """
+    Startup sweep for jobs an earlier run of this replica left unfinished.
+    Jobs whose upload is still spooled here are queued again, unless they had
+    already committed chunks with on_conflict=error, where a rerun would fail
+    on its own rows; those are marked failed. Unfinished jobs without a local
+    upload are marked failed after JOB_STALE_SECONDS, and spooled uploads of
+    finished or unknown jobs are deleted. Returns the count of each outcome.
+    """
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    spooled = {
+        name[: -len(".upload")]: os.path.join(SPOOL_DIR, name)
+        for name in os.listdir(SPOOL_DIR)
+        if name.endswith(".upload")
+    }
+    counts = {"resubmitted": 0, "failed": 0, "orphans_removed": 0}
+    resubmit = []
+    remove = []
+
+    db = SessionLocal()
+    try:
+        jobs = db.query(IngestJob).filter(IngestJob.status.in_(_UNFINISHED) | IngestJob.id.in_(list(spooled))).all()
+
+        for job in jobs:
+            path = spooled.pop(job.id, None)
+            if job.status not in _UNFINISHED:
+                if path is not None:
+                    remove.append(path)
+                    counts["orphans_removed"] += 1
+            elif path is not None and (job.status == "queued" or job.chunk_size is None or job.on_conflict != "error"):
+                # nothing was committed, or committed rows are skipped or updated on the rerun
+                job.status = "queued"
+                job.started_at = None
+                resubmit.append((job.id, path, job.loader, job.on_conflict, job.chunk_size))
+            elif path is not None or _age(job) > JOB_STALE_SECONDS:
+                job.status = "failed"
+                job.finished_at = _now()
+                job.error = (
+                    "Interrupted by a restart after committing some chunks, resubmit with on_conflict=skip"
+                    if path is not None
+                    else "Interrupted, the replica running it stopped and its upload is gone"
+                )
+                if path is not None:
+                    remove.append(path)
+                counts["failed"] += 1
+        db.commit()
+    finally:
+        db.close()
+
+    # whatever is left in spooled has no job row, e.g. a crash between spooling and queueing
+    counts["orphans_removed"] += len(spooled)
+    for path in remove + list(spooled.values()):
+        os.remove(path)
+
+    for args in resubmit:
+        _executor.submit(run_job, *args)
+    counts["resubmitted"] = len(resubmit)
+
+    if any(counts.values()):
+        logger.info(f"Recovered ingest jobs: {counts}")
+    return counts
+
+
+def shutdown_workers():
+    # queued jobs that never started stay "queued" with their upload spooled,
+    # recover_jobs resubmits them on the next start
+    _executor.shutdown(wait=False, cancel_futures=True)
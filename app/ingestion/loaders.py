@@ -0,0 +1,213 @@
+import csv
+import io
+from datetime import UTC, datetime
+from functools import partial
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Sequence, Tuple
+
+from psycopg2.extras import execute_values
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.ingestion.instrumentation import timed_stage
+from app.models.orders import ORDER_KEY, Order
+
+
+# column order of the row tuples handed to every loader
+ORDER_COLUMNS = (
+    "order_id",
+    "customer_id",
+    "product_id",
+    "quantity",
+    "price_per_unit",
+    "total_amount",
+    "status",
+    "order_date",
+    "created_at",
+)
+
+STAGING_TABLE = "orders_staging"
+
+# bytes psycopg2 pulls from the row stream per COPY message
+COPY_BUFFER_SIZE = 64 * 1024
+
+# rows per INSERT ... VALUES statement on the upsert path
+UPSERT_PAGE_SIZE = 1000
+
+_COLUMN_LIST = ", ".join(ORDER_COLUMNS)
+
+_KEY_LIST = ", ".join(ORDER_KEY)
+_KEY_INDEXES = [ORDER_COLUMNS.index(column) for column in ORDER_KEY]
+
+# every loader takes a session and row tuples and returns (inserted, updated)
+Loader = Callable[[Session, Sequence[Tuple]], Tuple[int, int]]
+
+# replays refresh the order but keep its original created_at
+_UPDATE_SET = ", ".join(
+    f"{column} = EXCLUDED.{column}" for column in ORDER_COLUMNS if column not in (*ORDER_KEY, "created_at")
+)
+
+
+def naive_utc(value: datetime) -> datetime:
+    # the timestamp columns hold UTC without a zone. COPY silently drops an offset
+    # while the ORM and execute_values convert it, so loader rows carry naive UTC
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+class CopyStream:
+    """
+    Read-only file-like object that renders row tuples as CSV on demand, so COPY
+    can consume validated rows without the whole payload being built up front.
+    """
+
+    def __init__(self, rows: Iterable[Sequence], rows_per_fill: int = 1000):
+        self._rows: Iterator[Sequence] = iter(rows)
+        self._rows_per_fill = rows_per_fill
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+
+    def _fill(self) -> bool:
+        rows = list(islice(self._rows, self._rows_per_fill))
+        if not rows:
+            return False
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerows(rows)
+        self._pending += self._buffer.getvalue()
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while (size < 0 or len(self._pending) < size) and self._fill():
+            pass
+        if size < 0 or size >= len(self._pending):
+            chunk, self._pending = self._pending, ""
+        else:
+            chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+    readline = read
+
+
+def copy_into(db: Session, table: str, rows: Iterable[Tuple], columns: Sequence[str] = ORDER_COLUMNS):
+    # run COPY on the connection the session is already using, so the load
+    # stays inside the session's transaction
+    raw_connection = db.connection().connection
+    with raw_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            CopyStream(rows),
+            size=COPY_BUFFER_SIZE,
+        )
+
+
+def _conflict_clause(on_conflict: str) -> str:
+    if on_conflict == "skip":
+        return f"ON CONFLICT ({_KEY_LIST}) DO NOTHING"
+    if on_conflict == "update":
+        return f"ON CONFLICT ({_KEY_LIST}) DO UPDATE SET {_UPDATE_SET}"
+    return ""
+
+
+def orm_load(db: Session, rows: Sequence[Tuple]) -> Tuple[int, int]:
+    with timed_stage("build"):
+        orders = [Order(**dict(zip(ORDER_COLUMNS, row))) for row in rows]
+    with timed_stage("insert"):
+        db.bulk_save_objects(orders)
+    return len(rows), 0
+
+
+def copy_load(db: Session, rows: Sequence[Tuple]) -> Tuple[int, int]:
+    """
+    Stream rows into orders with COPY FROM STDIN. A duplicate order_id fails the
+    whole statement, use on_conflict skip/update when the input may contain replays.
+    """
+    with timed_stage("insert"):
+        copy_into(db, Order.__tablename__, rows)
+    return len(rows), 0
+
+
+def upsert_load(db: Session, rows: Sequence[Tuple], on_conflict: str = "skip") -> Tuple[int, int]:
+    """
+    Write rows with multi-row INSERT ... ON CONFLICT (order key) statements.
+    Returns (inserted, updated); rows that were neither were skipped.
+    """
+    if on_conflict == "update":
+        # a statement may not update the same row twice, the last occurrence wins
+        rows = list({tuple(row[i] for i in _KEY_INDEXES): row for row in rows}.values())
+
+    raw_connection = db.connection().connection
+    with timed_stage("insert"), raw_connection.cursor() as cursor:
+        # xmax is 0 only for freshly inserted tuples
+        written = execute_values(
+            cursor,
+            f"INSERT INTO {Order.__tablename__} ({_COLUMN_LIST}) VALUES %s "
+            f"{_conflict_clause(on_conflict)} RETURNING (xmax = 0)",
+            rows,
+            page_size=UPSERT_PAGE_SIZE,
+            fetch=True,
+        )
+
+    inserted = sum(1 for (is_insert,) in written if is_insert)
+    return inserted, len(written) - inserted
+
+
+def staging_load(db: Session, rows: Sequence[Tuple], on_conflict: str = "error") -> Tuple[int, int]:
+    """
+    COPY rows into a transaction-scoped staging table, then merge them into
+    orders with the given conflict policy. Returns (inserted, updated).
+    """
+    with timed_stage("insert"):
+        return _stage_and_merge(db, rows, on_conflict)
+
+
+def _stage_and_merge(db: Session, rows: Sequence[Tuple], on_conflict: str) -> Tuple[int, int]:
+    db.execute(
+        text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ON COMMIT DROP AS "
+            f"SELECT {_COLUMN_LIST} FROM {Order.__tablename__} WITH NO DATA"
+        )
+    )
+    copy_into(db, STAGING_TABLE, rows)
+
+    # with a conflict policy, collapse duplicates inside the batch first. ctid
+    # follows COPY order here, so skip keeps the first occurrence, update the last
+    select = f"SELECT {_COLUMN_LIST} FROM {STAGING_TABLE}"
+    if on_conflict != "error":
+        ordering = "ctid DESC" if on_conflict == "update" else "ctid"
+        select = (
+            f"SELECT DISTINCT ON ({_KEY_LIST}) {_COLUMN_LIST} FROM {STAGING_TABLE} "
+            f"ORDER BY {_KEY_LIST}, {ordering}"
+        )
+    written = db.execute(
+        text(
+            f"INSERT INTO {Order.__tablename__} ({_COLUMN_LIST}) {select} "
+            f"{_conflict_clause(on_conflict)} RETURNING (xmax = 0)"
+        )
+    ).scalars().all()
+    db.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+
+    inserted = sum(1 for is_insert in written if is_insert)
+    return inserted, len(written) - inserted
+
+
+LOADERS = {
+    "orm": orm_load,
+    "copy": copy_load,
+    "staging": staging_load,
+}
+
+
+def resolve_loader(loader: str, on_conflict: str = "error") -> Loader:
+    """
+    Pick the write function for a loader and conflict policy. Plain COPY and the
+    ORM path cannot skip or update conflicting rows, so skip/update use the
+    multi-row upsert unless the staging merge was asked for.
+    """
+    if loader == "staging":
+        return partial(staging_load, on_conflict=on_conflict)
+    if on_conflict != "error":
+        return partial(upsert_load, on_conflict=on_conflict)
+    return LOADERS[loader]
@@ -0,0 +1,64 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, UTC
+from typing import List, Optional
+
+from app.core.logging_config import logger
+from app.ingestion.validation import ValidatedBatch, validate_batch
+
+
+# validation processes started with the app, 0 keeps validation in-process
+VALIDATION_WORKERS = int(os.getenv("INGEST_VALIDATION_WORKERS", "0"))
+
+# smallest slice worth shipping to another process
+MIN_CHUNK_SIZE = 500
+
+_pool: Optional[ProcessPoolExecutor] = None
+_workers = 0
+
+
+def start_validation_pool(workers: int = VALIDATION_WORKERS):
+    global _pool, _workers
+    if workers <= 0 or _pool is not None:
+        return
+    # spawn rather than fork, the server process already runs threads
+    _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    _workers = workers
+    logger.info(f"Validation pool started with {workers} workers")
+
+
+def shutdown_validation_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def validate_parallel(records: List[dict], first_row: int = 1, created_at: Optional[datetime] = None) -> ValidatedBatch:
+    """
+    Split a batch into one slice per pool worker, validate the slices in
+    parallel and merge them back in input order. Falls back to in-process
+    validation when the pool is not running or the batch is too small to split.
+    """
+    if created_at is None:
+        created_at = datetime.now(UTC)
+
+    pool = _pool
+    if pool is None or len(records) < 2 * MIN_CHUNK_SIZE:
+        return validate_batch(records, first_row, created_at)
+
+    chunk_size = max(MIN_CHUNK_SIZE, -(-len(records) // _workers))
+    futures = [
+        pool.submit(validate_batch, records[start : start + chunk_size], first_row + start, created_at)
+        for start in range(0, len(records), chunk_size)
+    ]
+
+    # every slice carries its own first_row, so row numbers survive the merge
+    merged = ValidatedBatch()
+    for future in futures:
+        part = future.result()
+        merged.rows.extend(part.rows)
+        merged.row_numbers.extend(part.row_numbers)
+        merged.errors.extend(part.errors)
+    return merged
@@ -0,0 +1,228 @@
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import logger
+from app.core.metrics import ingestion_total, ingestion_rows_rejected_total, ingest_batch_rows, ingest_rows_per_second
+from app.database.executor import run_db
+from app.database.invalidation import invalidate_orders
+from app.ingestion.instrumentation import StageClock, observe_stage, record_row_error, stage_clock, timed_stage
+from app.ingestion.loaders import Loader, resolve_loader
+from app.ingestion.parallel import validate_parallel
+from app.ingestion.savepoints import load_isolating
+from app.ingestion.streaming import BATCH_SIZE, iter_batches
+from app.ingestion.validation import validate_batch
+from app.ingestion.write_ahead import SpoolUnavailable, get_order_wal
+
+
+# only the first few row errors are returned to the client, the rest are counted
+MAX_REPORTED_ERRORS = 10
+
+
+@dataclass
+class IngestResult:
+    total_submitted: int = 0
+    inserted: int = 0
+    updated: int = 0
+    # valid rows left alone because their order_id already existed
+    skipped: int = 0
+    # valid rows written to the write-ahead log for the drainer to load
+    spooled: int = 0
+    failed: int = 0
+    errors: List[dict] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def successful(self) -> int:
+        return self.inserted + self.updated
+
+    def add_error(self, row: int, record: dict, error: str):
+        self.failed += 1
+        record_row_error(error)
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "data": record, "error": error})
+
+    def as_response(self) -> dict:
+        return {
+            "status": "accepted" if self.spooled else "completed",
+            "total_submitted": self.total_submitted,
+            "successful": self.successful,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "spooled": self.spooled,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+def process_batch(
+    db: Session,
+    batch: List[dict],
+    load: Loader,
+    result: IngestResult,
+    parallel: bool = False,
+    chunk_size: Optional[int] = None,
+    spool: Optional[Callable[[Sequence[Tuple]], None]] = None,
+):
+    """
+    Validate one batch and write its valid rows, updating the running result.
+    With spool, valid rows are handed to it (the write-ahead log) instead of
+    being written to the database.
+    With chunk_size, rows are written and committed chunk by chunk, and rows the
+    database rejects are isolated with savepoints and reported instead of
+    failing the whole ingest. Cached orders are invalidated whenever existing
+    rows were updated; inserts cannot make a cached entry stale.
+    """
+    first_row = result.total_submitted + 1
+    result.total_submitted += len(batch)
+    ingest_batch_rows.observe(len(batch))
+
+    validate = validate_parallel if parallel else validate_batch
+    with timed_stage("validate"):
+        validated = validate(batch, first_row)
+    for row_number, record, error in validated.errors:
+        result.add_error(row_number, record, error)
+
+    if validated.rows and spool is not None:
+        with timed_stage("spool"):
+            spool(validated.rows)
+        result.spooled += len(validated.rows)
+
+    elif validated.rows and chunk_size is None:
+        inserted, updated = load(db, validated.rows)
+        if updated:
+            invalidate_orders(db, [row[0] for row in validated.rows])
+        result.inserted += inserted
+        result.updated += updated
+        result.skipped += len(validated.rows) - inserted - updated
+
+    elif validated.rows:
+        for start in range(0, len(validated.rows), chunk_size):
+            rows = validated.rows[start : start + chunk_size]
+            row_numbers = validated.row_numbers[start : start + chunk_size]
+
+            inserted, updated, rejected = load_isolating(db, load, rows, row_numbers)
+            if updated:
+                invalidate_orders(db, [row[0] for row in rows])
+            with timed_stage("commit"):
+                db.commit()
+
+            result.inserted += inserted
+            result.updated += updated
+            result.skipped += len(rows) - inserted - updated - len(rejected)
+            for row_number, error in rejected:
+                result.add_error(row_number, batch[row_number - first_row], error)
+
+    logger.debug(f"Processed ingest batch ending at row {result.total_submitted}")
+
+
+def finish_ingest(db: Session, result: IngestResult, loader: str = "copy"):
+    with timed_stage("commit"):
+        db.commit()
+
+    elapsed = time.perf_counter() - result.started
+    if elapsed > 0:
+        ingest_rows_per_second.labels(loader).set(result.total_submitted / elapsed)
+
+    ingestion_total.inc(result.successful)
+    if result.failed:
+        ingestion_rows_rejected_total.inc(result.failed)
+
+    logger.info(
+        f"Ingest completed - submitted={result.total_submitted}, "
+        f"inserted={result.inserted}, updated={result.updated}, skipped={result.skipped}, "
+        f"spooled={result.spooled}, failed={result.failed}"
+    )
+
+
+def _observe_pull(clock: StageClock, started: float, read_before: float):
+    # pulling a batch reads the input and parses it, the reader wrappers tell the two apart
+    read = clock.read - read_before
+    observe_stage("read", read)
+    observe_stage("parse", time.perf_counter() - started - read)
+
+
+def _spooler(on_conflict: str) -> Callable[[Sequence[Tuple]], None]:
+    wal = get_order_wal()
+    if wal is None:
+        raise SpoolUnavailable("write-ahead log is not enabled, set ORDER_WAL_DIR")
+    return partial(wal.append, on_conflict=on_conflict)
+
+
+def ingest_records(
+    db: Session,
+    records: Iterable[dict],
+    loader: str = "copy",
+    on_conflict: str = "error",
+    batch_size: int = BATCH_SIZE,
+    on_batch: Optional[Callable[[IngestResult], None]] = None,
+    parallel: bool = False,
+    chunk_size: Optional[int] = None,
+    spool: bool = False,
+) -> IngestResult:
+    """
+    Validate and insert records batch by batch. Only one batch is held in memory
+    at a time. By default everything is committed in a single transaction at
+    the end so a database failure still leaves no partial writes; with
+    chunk_size, each chunk is committed on its own and rows the database rejects
+    are reported as errors (see process_batch). on_batch, if given, is called
+    with the running result after every batch. parallel spreads each batch's
+    validation over the shared process pool when it is running. spool appends
+    valid rows to the write-ahead log and returns once they are durable there.
+    """
+    load = resolve_loader(loader, on_conflict)
+    spool_rows = _spooler(on_conflict) if spool else None
+    result = IngestResult()
+
+    with stage_clock() as clock:
+        batches = iter_batches(records, batch_size)
+        while True:
+            started, read_before = time.perf_counter(), clock.read
+            batch = next(batches, None)
+            if batch is None:
+                break
+            _observe_pull(clock, started, read_before)
+
+            process_batch(db, batch, load, result, parallel, chunk_size, spool_rows)
+            if on_batch is not None:
+                on_batch(result)
+
+    finish_ingest(db, result, loader)
+    return result
+
+
+async def ingest_batches(
+    db: Session,
+    batches: AsyncIterator[List[dict]],
+    loader: str = "copy",
+    on_conflict: str = "error",
+    parallel: bool = False,
+    chunk_size: Optional[int] = None,
+    spool: bool = False,
+) -> IngestResult:
+    """
+    Async variant of ingest_records for request bodies. Each batch is written on
+    the database threads before the next one is pulled, so a slow database stops the
+    body from being read and pushes back on the client.
+    """
+    load = resolve_loader(loader, on_conflict)
+    spool_rows = _spooler(on_conflict) if spool else None
+    result = IngestResult()
+
+    with stage_clock() as clock:
+        batches = batches.__aiter__()
+        while True:
+            started, read_before = time.perf_counter(), clock.read
+            batch = await anext(batches, None)
+            if batch is None:
+                break
+            _observe_pull(clock, started, read_before)
+
+            await run_db(process_batch, db, batch, load, result, parallel, chunk_size, spool_rows)
+
+    await run_db(finish_ingest, db, result, loader)
+    return result
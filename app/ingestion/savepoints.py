@@ -0,0 +1,48 @@
+from typing import List, Sequence, Tuple
+
+import psycopg2
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import logger
+from app.ingestion.loaders import Loader
+
+
+# errors that only poison the rows being written. anything else (disk full, timeouts,
+# deadlocks, a failover to a read-only node) still aborts the ingest instead of
+# blaming every row. COPY and the upsert path use the raw psycopg2 cursor, so its
+# errors arrive unwrapped
+ROW_LEVEL_ERRORS = (IntegrityError, DataError, psycopg2.IntegrityError, psycopg2.DataError)
+
+
+def _error_message(error: Exception) -> str:
+    original = getattr(error, "orig", None) or error
+    return str(original).strip()
+
+
+def load_isolating(
+    db: Session,
+    load: Loader,
+    rows: Sequence[Tuple],
+    row_numbers: Sequence[int],
+) -> Tuple[int, int, List[Tuple[int, str]]]:
+    """
+    Write rows inside a SAVEPOINT. If the database rejects them, roll back to
+    the savepoint and bisect, so only the offending rows are dropped. Returns
+    (inserted, updated, [(row number, error)]). A clean chunk costs a single
+    load plus the savepoint round trip.
+    """
+    try:
+        with db.begin_nested():
+            inserted, updated = load(db, rows)
+        return inserted, updated, []
+
+    except ROW_LEVEL_ERRORS as e:
+        if len(rows) == 1:
+            logger.warning(f"Row {row_numbers[0]} rejected by database: {_error_message(e)}")
+            return 0, 0, [(row_numbers[0], f"database error: {_error_message(e)}")]
+
+    middle = len(rows) // 2
+    left = load_isolating(db, load, rows[:middle], row_numbers[:middle])
+    right = load_isolating(db, load, rows[middle:], row_numbers[middle:])
+    return left[0] + right[0], left[1] + right[1], left[2] + right[2]
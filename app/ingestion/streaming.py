@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Any, AsyncIterator, BinaryIO, Iterable, Iterator, List
+
+
+# rows handed to validation and insert at a time. keeps peak memory flat
+# regardless of the upload size
+BATCH_SIZE = 5000
+
+# longest NDJSON line accepted before the body is rejected, so a missing
+# newline cannot make the line buffer grow without bound
+NDJSON_MAX_LINE_BYTES = 1024 * 1024
+
+
+def iter_csv_records(stream: BinaryIO, encoding: str = "utf-8-sig") -> Iterator[dict]:
+    """
+    Lazily parse a binary CSV stream into dict rows. The stream is read in
+    chunks and decoded incrementally, so only the current chunk is held in memory.
+    """
+    text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        # leave the underlying upload open, the caller owns it
+        if not stream.closed:
+            text.detach()
+
+
+def iter_batches(records: Iterable[dict], batch_size: int = BATCH_SIZE) -> Iterator[List[dict]]:
+    # group rows into fixed size lists without materializing the whole input
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _parse_ndjson_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        # keep the raw text, validation rejects it and reports the row
+        return line.decode("utf-8", errors="replace")
+
+
+async def aiter_ndjson_batches(chunks: AsyncIterator[bytes], batch_size: int = BATCH_SIZE) -> AsyncIterator[List[Any]]:
+    """
+    Split an async byte stream into NDJSON records and yield them in batches.
+    Nothing more is read from the stream until the consumer asks for the next batch.
+    """
+    pending = b""
+    batch = []
+
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        if len(pending) > NDJSON_MAX_LINE_BYTES:
+            raise ValueError(f"NDJSON line exceeds {NDJSON_MAX_LINE_BYTES} bytes")
+
+        for line in lines:
+            if not line.strip():
+                continue
+            batch.append(_parse_ndjson_line(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+    if pending.strip():
+        batch.append(_parse_ndjson_line(pending))
+    if batch:
+        yield batch
@@ -0,0 +1,180 @@
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from decimal import Decimal
+from itertools import repeat
+from operator import mul
+from typing import Any, Callable, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.ingestion.loaders import naive_utc
+from app.schemas.order import OrderIngest
+
+
+# the fast checks below only ever accept values OrderIngest would accept and
+# convert them the same way. anything they reject is re-validated with the
+# schema itself, which keeps the rules and error messages identical
+_MISSING = object()
+_REJECT = object()
+
+_ORDER_ID = re.compile(r"ORD-\d{5,}")
+_CUSTOMER_ID = re.compile(r"CUST-\d{5,}")
+_PRODUCT_ID = re.compile(r"PROD-\d{5,}")
+_INTEGER = re.compile(r"[0-9]+")
+_DECIMAL = re.compile(r"[0-9]+(\.[0-9]+)?")
+_NAIVE_DATETIME = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}[T ][0-9]{2}:[0-9]{2}:[0-9]{2}(\.[0-9]{1,6})?")
+_ONE = Decimal(1)
+_STATUSES = frozenset(("pending", "shipped", "completed", "cancelled"))
+
+
+@dataclass
+class ValidatedBatch:
+    # valid rows as tuples in ORDER_COLUMNS order, ready for a loader
+    rows: List[Tuple] = field(default_factory=list)
+    # 1-based input row number of each valid row
+    row_numbers: List[int] = field(default_factory=list)
+    # (row number, original record, error message) for each rejected row
+    errors: List[Tuple[int, Any, str]] = field(default_factory=list)
+
+
+def _pattern_checker(pattern: re.Pattern) -> Callable[[Any], Any]:
+    match = pattern.fullmatch
+
+    def check(value):
+        if type(value) is str and match(value):
+            return value
+        return _REJECT
+
+    return check
+
+
+def _check_quantity(value):
+    if type(value) is int:
+        return value if value > 0 else _REJECT
+    if type(value) is str and _INTEGER.fullmatch(value):
+        value = int(value)
+        return value if value > 0 else _REJECT
+    return _REJECT
+
+
+def _check_price(value):
+    if type(value) is str and _DECIMAL.fullmatch(value):
+        value = Decimal(value)
+    elif type(value) is int:
+        value = Decimal(value)
+    elif type(value) is not Decimal or not value.is_finite():
+        return _REJECT
+    return value if value > 0 else _REJECT
+
+
+def _check_order_date(value):
+    if type(value) is datetime:
+        return naive_utc(value)
+    if type(value) is str and _NAIVE_DATETIME.fullmatch(value):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return _REJECT
+    return _REJECT
+
+
+def _check_status(value):
+    if value is _MISSING:
+        return "pending"
+    if value is None or (type(value) is str and value in _STATUSES):
+        return value
+    return _REJECT
+
+
+# field name -> check applied to that whole column
+_COLUMN_CHECKS = (
+    ("order_id", _pattern_checker(_ORDER_ID)),
+    ("customer_id", _pattern_checker(_CUSTOMER_ID)),
+    ("product_id", _pattern_checker(_PRODUCT_ID)),
+    ("quantity", _check_quantity),
+    ("price_per_unit", _check_price),
+    ("status", _check_status),
+    ("order_date", _check_order_date),
+)
+
+
+def _validate_row(record: dict) -> Tuple:
+    # slow path, the schema is the source of truth for anything unusual
+    order = OrderIngest.model_validate(record)
+    return (
+        order.order_id,
+        order.customer_id,
+        order.product_id,
+        order.quantity,
+        order.price_per_unit,
+        Decimal(order.quantity) * order.price_per_unit,
+        order.status,
+        naive_utc(order.order_date),
+    )
+
+
+def validate_batch(
+    records: List[dict],
+    first_row: int = 1,
+    created_at: Optional[datetime] = None,
+) -> ValidatedBatch:
+    """
+    Validate a block of records column by column with the OrderIngest rules and
+    compute total_amount for the whole block. Returns the valid rows as loader
+    tuples plus the row numbers and messages of the rejected ones.
+    """
+    created_at = naive_utc(created_at or datetime.now(UTC))
+
+    values = [r if type(r) is dict else {} for r in records]
+    columns = {}
+    rejected = set()
+
+    for name, check in _COLUMN_CHECKS:
+        column = list(map(check, [r.get(name, _MISSING) for r in values]))
+        if _REJECT in column:
+            rejected.update(idx for idx, value in enumerate(column) if value is _REJECT)
+        columns[name] = column
+
+    if rejected:
+        # placeholders so the whole-column arithmetic below never sees a reject
+        for idx in rejected:
+            columns["quantity"][idx] = 1
+            columns["price_per_unit"][idx] = _ONE
+
+    totals = list(map(mul, map(Decimal, columns["quantity"]), columns["price_per_unit"]))
+    rows = list(
+        zip(
+            columns["order_id"],
+            columns["customer_id"],
+            columns["product_id"],
+            columns["quantity"],
+            columns["price_per_unit"],
+            totals,
+            columns["status"],
+            columns["order_date"],
+            repeat(created_at),
+        )
+    )
+    row_numbers = list(range(first_row, first_row + len(rows)))
+
+    if not rejected:
+        return ValidatedBatch(rows=rows, row_numbers=row_numbers)
+
+    result = ValidatedBatch()
+    for idx, row in enumerate(rows):
+        if idx in rejected:
+            record = records[idx]
+            try:
+                row = _validate_row(record) + (created_at,)
+            except ValidationError as e:
+                result.errors.append((row_numbers[idx], record, str(e)))
+                continue
+            except Exception as e:
+                result.errors.append((row_numbers[idx], record, f"unexpected error: {str(e)}"))
+                continue
+
+        result.rows.append(row)
+        result.row_numbers.append(row_numbers[idx])
+
+    return result
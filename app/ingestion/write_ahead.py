@@ -0,0 +1,481 @@
+import errno
+import fcntl
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from app.core.logging_config import logger
+from app.core.metrics import (
+    order_wal_append_seconds,
+    order_wal_pending_bytes,
+    order_wal_segments,
+    order_wal_drain_lag_seconds,
+    order_wal_drained_rows_total,
+    order_wal_rejected_rows_total,
+    order_wal_quarantined_bytes_total,
+)
+from app.database.invalidation import invalidate_orders
+from app.database.session import SessionLocal
+from app.ingestion.loaders import ORDER_COLUMNS, naive_utc, resolve_loader
+from app.ingestion.savepoints import load_isolating
+
+
+# off unless ORDER_WAL_DIR is set
+WAL_DIR = os.getenv("ORDER_WAL_DIR")
+WAL_SEGMENT_BYTES = int(os.getenv("ORDER_WAL_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+# undrained bytes beyond which appends are refused instead of filling the disk
+WAL_MAX_BYTES = int(os.getenv("ORDER_WAL_MAX_BYTES", str(1024 * 1024 * 1024)))
+# rows per drain transaction
+WAL_DRAIN_ROWS = int(os.getenv("ORDER_WAL_DRAIN_ROWS", "10000"))
+
+# every record is <payload length><crc32 of payload><payload>
+_HEADER = struct.Struct("<II")
+_SEGMENT_SUFFIX = ".wal"
+_CHECKPOINT = "checkpoint"
+_REJECTED = "rejected.ndjson"
+_LOCK = "lock"
+# bytes following a corrupt record, kept for manual recovery
+_QUARANTINE = "quarantine"
+
+_MAX_BACKOFF = 30.0
+
+_QUANTITY = ORDER_COLUMNS.index("quantity")
+_DECIMALS = [ORDER_COLUMNS.index(column) for column in ("price_per_unit", "total_amount")]
+_DATETIMES = [ORDER_COLUMNS.index(column) for column in ("order_date", "created_at")]
+
+
+class SpoolFull(Exception):
+    pass
+
+
+class SpoolUnavailable(Exception):
+    pass
+
+
+class SpoolWriteFailed(Exception):
+    """Writing or fsyncing the log failed; errno is that of the underlying OSError."""
+
+    def __init__(self, message: str, errno: Optional[int] = None):
+        super().__init__(message)
+        self.errno = errno
+
+    @property
+    def disk_full(self) -> bool:
+        return self.errno in (errno.ENOSPC, errno.EDQUOT)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return naive_utc(value).isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode_row(values: list) -> Tuple:
+    values[_QUANTITY] = int(values[_QUANTITY])
+    for i in _DECIMALS:
+        values[i] = Decimal(values[i])
+    for i in _DATETIMES:
+        values[i] = datetime.fromisoformat(values[i])
+    return tuple(values)
+
+
+def _fsync_dir(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class WriteAheadLog:
+    """
+    Append-only, checksummed, segmented log of accepted order rows. append()
+    returns once its record is fsynced; concurrent appenders share one fsync.
+    The drainer replays records into orders in large idempotent upserts and
+    advances a checkpoint only after each commit, so a crash at any point
+    replays at most the last batch. On open, a torn record at the tail of the
+    last segment is truncated away. One process owns a directory at a time.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = self._acquire(directory)
+
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._has_data = threading.Condition(self._lock)
+
+        segments = self._segments() or [1]
+        self._checkpoint = self._read_checkpoint(segments)
+        self._seq = segments[-1]
+        self._file = open(self._path(self._seq), "ab", buffering=0)
+        self._recover_tail()
+        self._written = (self._seq, self._file.tell())
+        self._synced = self._written
+        self._update_gauges()
+
+    @staticmethod
+    def _acquire(directory: str):
+        # appends from two processes would interleave in one segment and race on the checkpoint
+        lock_file = open(os.path.join(directory, _LOCK), "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.seek(0)
+            owner = lock_file.read().strip() or "unknown"
+            lock_file.close()
+            raise SpoolUnavailable(
+                f"Write-ahead log {directory} is in use by process {owner}; give each worker its own ORDER_WAL_DIR"
+            )
+        lock_file.truncate(0)
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        return lock_file
+
+    # -- layout --------------------------------------------------------------
+
+    def _path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{seq:020d}{_SEGMENT_SUFFIX}")
+
+    def _segments(self) -> List[int]:
+        return sorted(int(name[: -len(_SEGMENT_SUFFIX)]) for name in os.listdir(self.directory) if name.endswith(_SEGMENT_SUFFIX))
+
+    def _read_checkpoint(self, segments: List[int]) -> Tuple[int, int]:
+        try:
+            with open(os.path.join(self.directory, _CHECKPOINT)) as f:
+                seq, offset = (int(part) for part in f.read().split())
+        except (OSError, ValueError):
+            return segments[0], 0
+        # a checkpoint outside the segments on disk means the log was reset
+        return (seq, offset) if segments[0] <= seq <= segments[-1] else (segments[0], 0)
+
+    def _write_checkpoint(self, position: Tuple[int, int]):
+        path = os.path.join(self.directory, _CHECKPOINT)
+        with open(path + ".tmp", "w") as f:
+            f.write(f"{position[0]} {position[1]}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        _fsync_dir(self.directory)
+
+    def _recover_tail(self):
+        # keep only the complete, checksummed records of the last segment
+        valid = 0
+        with open(self._path(self._seq), "rb") as f:
+            for _, end in self._iter_segment(f, 0):
+                valid = end
+            size = f.seek(0, os.SEEK_END)
+            f.seek(valid)
+            header = f.read(_HEADER.size)
+        if valid < size:
+            # a torn write is the last record; if bytes follow the bad record, acknowledged records may be among them
+            length = _HEADER.unpack(header)[0] if len(header) == _HEADER.size else 0
+            torn = valid + _HEADER.size + length >= size and length <= WAL_SEGMENT_BYTES
+            if not torn:
+                copied = self._quarantine(self._seq, valid)
+                logger.error(
+                    f"Corrupt write-ahead log record in {self._path(self._seq)} at offset {valid}, "
+                    f"{copied} bytes moved to {_QUARANTINE}/"
+                )
+            logger.warning(f"Truncating write-ahead log tail: {self._path(self._seq)} at {valid} of {size} bytes")
+            self._file.truncate(valid)
+            os.fsync(self._file.fileno())
+        self._file.seek(valid)
+
+    def _quarantine(self, seq: int, offset: int) -> int:
+        """Copy the rest of segment seq from offset into the quarantine directory."""
+        directory = os.path.join(self.directory, _QUARANTINE)
+        os.makedirs(directory, exist_ok=True)
+        target = os.path.join(directory, f"{seq:020d}-{offset}{_SEGMENT_SUFFIX}")
+        with open(self._path(seq), "rb") as src, open(target, "wb") as dst:
+            src.seek(offset)
+            copied = dst.write(src.read())
+            dst.flush()
+            os.fsync(dst.fileno())
+        _fsync_dir(directory)
+        order_wal_quarantined_bytes_total.inc(copied)
+        return copied
+
+    @staticmethod
+    def _iter_segment(f, offset: int, end: Optional[int] = None) -> Iterator[Tuple[bytes, int]]:
+        f.seek(offset)
+        while end is None or offset < end:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            length, checksum = _HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                return
+            offset += _HEADER.size + length
+            yield payload, offset
+
+    # -- appending -----------------------------------------------------------
+
+    def pending_bytes(self) -> int:
+        seq, offset = self._checkpoint
+        written_seq, written_offset = self._written
+        total = 0
+        for segment in range(seq, written_seq + 1):
+            size = written_offset if segment == written_seq else os.path.getsize(self._path(segment))
+            total += size - (offset if segment == seq else 0)
+        return total
+
+    def append(self, rows: Sequence[Tuple], on_conflict: str = "skip"):
+        """Durably record rows. Raises SpoolFull when the undrained backlog is over WAL_MAX_BYTES."""
+        started = time.perf_counter()
+        payload = json.dumps(
+            {"on_conflict": on_conflict, "at": time.time(), "rows": [[_encode_value(v) for v in row] for row in rows]},
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+        record = _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+        with self._lock:
+            if self.pending_bytes() + len(payload) > WAL_MAX_BYTES:
+                raise SpoolFull("write-ahead log is full")
+            try:
+                if self._file.tell() and self._file.tell() + len(record) > WAL_SEGMENT_BYTES:
+                    self._rotate()
+                self._write(record)
+            except OSError as e:
+                raise SpoolWriteFailed(f"Write-ahead log write failed: {str(e)}", e.errno) from e
+            self._written = (self._seq, self._file.tell())
+            position = self._written
+
+        try:
+            self._sync(position)
+        except OSError as e:
+            raise SpoolWriteFailed(f"Write-ahead log fsync failed: {str(e)}", e.errno) from e
+        order_wal_append_seconds.observe(time.perf_counter() - started)
+
+    def _write(self, record: bytes):
+        # a partly written record would hide every later one from the drainer, cut it off again
+        start = self._file.tell()
+        view = memoryview(record)
+        try:
+            while view:
+                view = view[self._file.write(view) :]
+        except OSError:
+            self._file.truncate(start)
+            self._file.seek(start)
+            raise
+
+    def _rotate(self):
+        # the old segment is complete and durable before anything lands in the next
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._seq += 1
+        self._file = open(self._path(self._seq), "ab", buffering=0)
+        _fsync_dir(self.directory)
+        self._synced = (self._seq, 0)
+        order_wal_segments.set(self._seq - self._checkpoint[0] + 1)
+
+    def _sync(self, position: Tuple[int, int]):
+        # group commit: whoever fsyncs first covers every record written before it
+        with self._sync_lock:
+            if self._synced >= position:
+                return
+            with self._lock:
+                self._file.flush()
+                target = self._written
+                # a duplicate descriptor stays valid if the segment rotates meanwhile
+                fileno = os.dup(self._file.fileno())
+            try:
+                os.fsync(fileno)
+            finally:
+                os.close(fileno)
+            with self._lock:
+                self._synced = max(self._synced, target)
+                self._has_data.notify_all()
+
+    # -- draining ------------------------------------------------------------
+
+    def wait_for_data(self, timeout: float) -> bool:
+        with self._lock:
+            if self._synced > self._checkpoint:
+                return True
+            return self._has_data.wait(timeout)
+
+    def read_pending(self, max_rows: int) -> Tuple[List[Tuple[str, float, List[Tuple]]], Tuple[int, int]]:
+        """
+        Durable records after the checkpoint, up to about max_rows, and the
+        position after them. Everything from a corrupt record to the end of its
+        segment is quarantined and skipped, so one bad record cannot stall the log.
+        """
+        with self._lock:
+            synced = self._synced
+        records = []
+        rows = 0
+        seq, offset = self._checkpoint
+        while (seq, offset) < synced and rows < max_rows:
+            end = synced[1] if seq == synced[0] else None
+            with open(self._path(seq), "rb") as f:
+                for payload, offset in self._iter_segment(f, offset, end):
+                    record = json.loads(payload)
+                    records.append((record["on_conflict"], record["at"], [_decode_row(r) for r in record["rows"]]))
+                    rows += len(record["rows"])
+                    if rows >= max_rows:
+                        break
+                else:
+                    if seq == synced[0] and offset >= synced[1]:
+                        break
+                    if seq == synced[0]:
+                        # later appends land behind the corrupt record, start a new segment for them
+                        with self._lock:
+                            if self._seq == seq:
+                                self._rotate()
+                    if offset < os.path.getsize(self._path(seq)):
+                        copied = self._quarantine(seq, offset)
+                        logger.error(
+                            f"Corrupt write-ahead log record in {self._path(seq)} at offset {offset}, "
+                            f"{copied} bytes moved to {_QUARANTINE}/ and skipped"
+                        )
+                    seq, offset = seq + 1, 0
+        return records, (seq, offset)
+
+    @property
+    def checkpoint(self) -> Tuple[int, int]:
+        return self._checkpoint
+
+    def commit(self, position: Tuple[int, int]):
+        """Advance the checkpoint after a drained batch committed and drop finished segments."""
+        self._write_checkpoint(position)
+        with self._lock:
+            old_seq = self._checkpoint[0]
+            self._checkpoint = position
+        for seq in range(old_seq, position[0]):
+            try:
+                os.remove(self._path(seq))
+            except FileNotFoundError:
+                pass
+        self._update_gauges()
+
+    def reject(self, rows: List[Tuple[Tuple, str]]):
+        # rows the database refuses are kept for inspection instead of blocking the log
+        with open(os.path.join(self.directory, _REJECTED), "a") as f:
+            for row, error in rows:
+                f.write(json.dumps({"row": [_encode_value(v) for v in row], "error": error}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _update_gauges(self):
+        order_wal_pending_bytes.set(self.pending_bytes())
+        order_wal_segments.set(self._seq - self._checkpoint[0] + 1)
+
+    def close(self):
+        with self._lock:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._lock_file.close()
+
+
+def drain_once(wal: WriteAheadLog) -> int:
+    """Replay up to WAL_DRAIN_ROWS spooled rows into orders in one transaction, returns rows drained."""
+    records, position = wal.read_pending(WAL_DRAIN_ROWS)
+    if not records:
+        if position > wal.checkpoint:
+            # only skipped corrupt bytes
+            wal.commit(position)
+        return 0
+
+    drained = 0
+    rejected = []
+    with SessionLocal() as db:
+        for on_conflict, _, rows in records:
+            # records were acknowledged already, a replayed or duplicate order is skipped, never an error
+            load = resolve_loader("copy", "update" if on_conflict == "update" else "skip")
+            # only integrity and data errors come back as rejected rows. anything else
+            # (disk full, timeouts, read-only after a failover) raises before the
+            # checkpoint moves, so the batch stays spooled and the drainer retries it
+            _, updated, errors = load_isolating(db, load, rows, range(len(rows)))
+            if updated:
+                invalidate_orders(db, [row[0] for row in rows])
+            rejected.extend((rows[i], error) for i, error in errors)
+            drained += len(rows)
+        db.commit()
+
+    if rejected:
+        wal.reject(rejected)
+        order_wal_rejected_rows_total.inc(len(rejected))
+        logger.warning(f"Write-ahead log drain rejected {len(rejected)} rows, see {_REJECTED}")
+
+    wal.commit(position)
+    order_wal_drained_rows_total.inc(drained)
+    order_wal_drain_lag_seconds.set(max(0.0, time.time() - records[-1][1]))
+    return drained
+
+
+class WalDrainer:
+    """Background thread replaying the write-ahead log, backing off while the database is down."""
+
+    def __init__(self, wal: WriteAheadLog):
+        self._wal = wal
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="wal-drainer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        backoff = 0.5
+        while not self._stop.is_set():
+            if not self._wal.wait_for_data(1.0):
+                order_wal_drain_lag_seconds.set(0)
+                continue
+            try:
+                drained = 0
+                while not self._stop.is_set():
+                    batch = drain_once(self._wal)
+                    if not batch:
+                        break
+                    drained += batch
+                if not drained:
+                    # data was reported but nothing could be read, do not spin on it
+                    self._stop.wait(backoff)
+                backoff = 0.5
+            except Exception as e:
+                logger.warning(f"Write-ahead log drain failed, retrying in {backoff:.1f}s: {str(e)}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, _MAX_BACKOFF)
+
+
+_wal: Optional[WriteAheadLog] = None
+_wal_lock = threading.Lock()
+
+
+def get_order_wal() -> Optional[WriteAheadLog]:
+    """
+    The process-wide log, None unless ORDER_WAL_DIR is set. Opened on first use
+    rather than at import so validation worker processes never touch it.
+    """
+    global _wal
+    if WAL_DIR and _wal is None:
+        with _wal_lock:
+            if _wal is None:
+                _wal = WriteAheadLog(WAL_DIR)
+    return _wal
+
+
+def wal_drainer_from_env() -> Optional[WalDrainer]:
+    wal = get_order_wal()
+    return WalDrainer(wal) if wal is not None else None
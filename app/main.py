@@ -1,5 +1,7 @@
-from fastapi import FastAPI, Depends, Response
-from app.db import get_connection
+import os
+from typing import List
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter, ValidationError
 from app.schemas.event import event
 from app.database.init_db import init_db
 from decimal import Decimal
@@ -14,15 +16,73 @@ from app.core.exception_handlers import (
     general_exception_handler,
 )
 from sqlalchemy import text
+from app.core.cache import order_cache
+from app.core.middleware import MetricsMiddleware
 from app.core.metrics import generate_latest, CONTENT_TYPE_LATEST, orders_created_total
 
-from app.database import get_db
+from app.database import (
+    get_db,
+    run_db,
+    shutdown_db_executor,
+    SessionLocal,
+    database_heartbeat_from_env,
+    group_commit_from_env,
+    invalidate_orders,
+    invalidation_listener_from_env,
+    rollup_compactor_from_env,
+    partition_maintainer_from_env,
+    pool_sizer_from_env,
+)
 from app.schemas.order import OrderIngest, OrderResponse
 from app.models import Order
 from app.api.endpoints import router as ingest_router
+from app.ingestion import (
+    ORDER_COLUMNS,
+    SpoolFull,
+    SpoolWriteFailed,
+    event_buffer_from_env,
+    get_order_wal,
+    wal_drainer_from_env,
+    recover_jobs,
+    shutdown_workers,
+    start_validation_pool,
+    shutdown_validation_pool,
+)
 
 app = FastAPI(title="Data Ingestion Service")
 
+app.add_middleware(MetricsMiddleware)
+
+# None unless ORDER_GROUP_COMMIT is set, POST /orders then writes directly
+order_writer = group_commit_from_env(Order.__table__, SessionLocal, key="order_id")
+
+# None unless ORDER_WAL_DIR is set, POST /orders then acknowledges once the order is
+# fsynced to the local write-ahead log and the drainer loads it into the database
+order_wal = get_order_wal()
+wal_drainer = wal_drainer_from_env()
+
+# POST /events and /events/batch are buffered in memory and written in bulk
+event_buffer = event_buffer_from_env(SessionLocal)
+_event_list = TypeAdapter(List[event])
+EVENT_BATCH_MAX_SIZE = int(os.getenv("EVENT_BATCH_MAX_SIZE", "10000"))
+# checked before parsing, so an oversized batch is refused without being buffered
+EVENT_BATCH_MAX_BYTES = int(os.getenv("EVENT_BATCH_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# None unless ORDER_CACHE_NOTIFY is set, other replicas' writes then only expire by TTL
+cache_listener = invalidation_listener_from_env()
+
+# folds the order_rollup_deltas change log into order_rollups in the background
+rollup_compactor = rollup_compactor_from_env()
+
+# None unless ORDERS_PARTITIONED is set, then keeps monthly partitions ahead of time
+partition_maintainer = partition_maintainer_from_env()
+
+# checks the database in the background, /db/health and /ready answer from its last result
+db_heartbeat = database_heartbeat_from_env()
+
+# None unless DB_POOL_ADAPTIVE is set, then grows and shrinks the pool with checkout wait times
+pool_sizer = pool_sizer_from_env()
+
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(IntegrityError, integrity_error_handler)
 app.add_exception_handler(Exception, general_exception_handler)
@@ -37,61 +97,133 @@ def health():
 
 
 @app.get("/db/health")
-def db_health(db: Session = Depends(get_db)):
-    logger.info("Database health check requested")
-    try:
-        with get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1;")
-                cur.fetchone()
-        return {"database": "healthy"}
-    except Exception as e:
-        logger.error(f"Database health check failed: {str(e)}")
-        return {
-            "database": "unhealthy",
-            "detail": str(e),
-            "timestamp": datetime.now(UTC).isoformat(),
-        }
+async def db_health():
+    """
+    Database status from the background heartbeat (DB_HEARTBEAT_INTERVAL_SECONDS): the last SELECT 1 result and
+    latency, the age of the last success and current pool usage. Probes never query the database themselves.
+    """
+    return db_heartbeat.status()
+
+
+@app.get("/ready")
+async def ready(response: Response):
+    """
+    Readiness for load balancers: 503 while the last successful heartbeat is older than
+    DB_HEARTBEAT_MAX_AGE_SECONDS or the pool is saturated, so traffic moves away before requests queue on it.
+    """
+    status = db_heartbeat.status()
+    reason = db_heartbeat.ready(status)
+    if reason is not None:
+        response.status_code = 503
+    return {"ready": reason is None, "reason": reason, **status}
 
 
 @app.post("/events")
 def ingest_event(event: event):
+    if not event_buffer.offer([event]):
+        raise HTTPException(status_code=503, detail="Event buffer is full, retry later")
     return {"message": "event received", "event": event}
 
 
-@app.post("/orders", response_model=OrderResponse)
-def create_order(order: OrderIngest, db: Session = Depends(get_db)):
+async def _read_limited(request: Request, max_bytes: int) -> bytes:
+    # trust a declared length to refuse early, count the stream for chunked bodies
+    too_large = HTTPException(status_code=413, detail=f"Batch body larger than {max_bytes} bytes")
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+@app.post("/events/batch", status_code=202)
+async def ingest_event_batch(request: Request):
     """
-    Create a new order
+    Accept a JSON array of events. The body is parsed and validated in one pass by pydantic-core rather than
+    decoded to Python objects first; events are buffered and written to the events table in bulk. The batch is
+    accepted or rejected as a whole. Bodies over EVENT_BATCH_MAX_BYTES are refused with 413 before parsing.
     """
+    body = await _read_limited(request, EVENT_BATCH_MAX_BYTES)
+    try:
+        events = _event_list.validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
 
-    logger.info(f"Creating order: {order.order_id}")
-    total_amount = Decimal(order.quantity) * order.price_per_unit
+    if len(events) > EVENT_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {EVENT_BATCH_MAX_SIZE} events per batch")
+    if not event_buffer.offer(events):
+        raise HTTPException(status_code=503, detail="Event buffer is full, retry later")
+
+    return {"message": "events received", "count": len(events)}
 
+
+def _insert_order(db: Session, values: dict) -> Order:
     try:
-        db_order = Order(
-            order_id=order.order_id,
-            customer_id=order.customer_id,
-            product_id=order.product_id,
-            quantity=order.quantity,
-            price_per_unit=order.price_per_unit,
-            order_date=order.order_date,
-            status=order.status,
-            total_amount=total_amount,
-            created_at=datetime.now(UTC),
-        )
+        db_order = Order(**values)
 
         db.add(db_order)
+        invalidate_orders(db, [db_order.order_id])
         db.commit()
         db.refresh(db_order)
+        return db_order
+
+    except Exception:
+        db.rollback()
+        raise
+
+
+@app.post("/orders", response_model=OrderResponse)
+async def create_order(order: OrderIngest, response: Response, db: Session = Depends(get_db)):
+    """
+    Create a new order. With ORDER_GROUP_COMMIT enabled, concurrent requests are queued and written together in
+    one multi-row INSERT ... RETURNING and one commit. With ORDER_WAL_DIR set, the order is fsynced to the local
+    write-ahead log and acknowledged with 202; it reaches the database through the background drainer, where a
+    duplicate order_id is skipped.
+    """
+
+    logger.info(f"Creating order: {order.order_id}")
+    total_amount = Decimal(order.quantity) * order.price_per_unit
+
+    values = dict(
+        order_id=order.order_id,
+        customer_id=order.customer_id,
+        product_id=order.product_id,
+        quantity=order.quantity,
+        price_per_unit=order.price_per_unit,
+        order_date=order.order_date,
+        status=order.status,
+        total_amount=total_amount,
+        created_at=datetime.now(UTC),
+    )
+
+    try:
+        if order_wal is not None:
+            await run_db(order_wal.append, [tuple(values[column] for column in ORDER_COLUMNS)])
+            response.status_code = 202
+            db_order = values
+        elif order_writer is not None:
+            db_order = await order_writer.insert(values)
+            order_cache.invalidate([order.order_id])
+        else:
+            db_order = await run_db(_insert_order, db, values)
 
         orders_created_total.inc()
 
-        logger.info("Order successfully created: {order.order_id}")
+        logger.info(f"Order successfully created: {order.order_id}")
         return db_order
 
+    except SpoolFull as e:
+        logger.error(f"Failed to spool order {order.order_id}: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
+
+    except SpoolWriteFailed as e:
+        logger.error(f"Failed to spool order {order.order_id}: {str(e)}")
+        raise HTTPException(status_code=507 if e.disk_full else 503, detail=str(e))
+
     except Exception as e:
-        db.rollback()
         logger.error(f"Failed to create order {order.order_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
@@ -105,12 +237,49 @@ def metrics():
 @app.on_event("startup")
 async def startup_event():
     logger.info("Application starting up")
+    start_validation_pool()
+    db_heartbeat.start()
+    try:
+        recover_jobs()
+    except Exception as e:
+        logger.error(f"Could not recover unfinished ingest jobs: {str(e)}")
+    event_buffer.start()
+    if order_writer is not None:
+        order_writer.start()
+    if cache_listener is not None:
+        cache_listener.start()
+    if rollup_compactor is not None:
+        rollup_compactor.start()
+    if partition_maintainer is not None:
+        partition_maintainer.start()
+    if wal_drainer is not None:
+        wal_drainer.start()
+    if pool_sizer is not None:
+        pool_sizer.start()
     logger.info("Database connection established")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Application shutting down")
+    shutdown_workers()
+    shutdown_validation_pool()
+    event_buffer.stop()
+    if order_writer is not None:
+        order_writer.stop()
+    if cache_listener is not None:
+        cache_listener.stop()
+    if rollup_compactor is not None:
+        rollup_compactor.stop()
+    if partition_maintainer is not None:
+        partition_maintainer.stop()
+    if wal_drainer is not None:
+        wal_drainer.stop()
+        order_wal.close()
+    if pool_sizer is not None:
+        pool_sizer.stop()
+    db_heartbeat.stop()
+    shutdown_db_executor()
 
 
 init_db()
@@ -1,3 +1,6 @@
 from app.models.orders import Order
+from app.models.ingest_jobs import IngestJob
+from app.models.rollups import OrderRollup, OrderRollupDelta
+from app.models.events import Event
 
-__all__ = ["Order"]
+__all__ = ["Order", "IngestJob", "OrderRollup", "OrderRollupDelta", "Event"]
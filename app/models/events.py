@@ -0,0 +1,34 @@
+from __future__ import annotations
+from datetime import UTC, datetime
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    String,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from app.database.base import Base
+
+
+class Event(Base):
+    __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_event_type_occurred_at", "event_type", "occurred_at"),
+        # events arrive roughly in time order, a BRIN index stays tiny and
+        # costs next to nothing per insert
+        Index("ix_events_occurred_at", "occurred_at", postgresql_using="brin"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    event_id = Column(String, nullable=False, index=True)
+    event_type = Column(String, nullable=False)
+    user_id = Column(String, nullable=True)
+
+    payload = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+
+    occurred_at = Column(DateTime, nullable=False)
+    received_at = Column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+from datetime import UTC, datetime
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Integer,
+    String,
+    Text,
+)
+from app.database.base import Base
+
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id = Column(String, primary_key=True)
+    status = Column(String, nullable=False, default="queued", index=True)
+
+    filename = Column(String, nullable=True)
+    loader = Column(String, nullable=False)
+    on_conflict = Column(String, nullable=False)
+    chunk_size = Column(Integer, nullable=True)
+
+    rows_parsed = Column(Integer, nullable=False, default=0)
+    rows_validated = Column(Integer, nullable=False, default=0)
+    rows_inserted = Column(Integer, nullable=False, default=0)
+    rows_updated = Column(Integer, nullable=False, default=0)
+    rows_skipped = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+
+    errors = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    @property
+    def rows_per_second(self) -> float | None:
+        if self.started_at is None:
+            return None
+        started = self.started_at.replace(tzinfo=None)
+        finished = (self.finished_at or datetime.now(UTC)).replace(tzinfo=None)
+        elapsed = (finished - started).total_seconds()
+        return round(self.rows_parsed / elapsed, 2) if elapsed > 0 else None
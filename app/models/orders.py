@@ -1,4 +1,5 @@
 from __future__ import annotations
+import os
 from datetime import UTC, datetime
 
 from sqlalchemy import (
@@ -7,20 +8,47 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database.base import Base
 
 
+# with ORDERS_PARTITIONED set, init_db creates orders range-partitioned by month
+# on order_date (see app/database/partitions.py). PostgreSQL only enforces
+# unique keys that include the partition column, so order_id is then unique
+# per order_date and upserts conflict on both
+ORDERS_PARTITIONED = os.getenv("ORDERS_PARTITIONED", "").lower() in ("1", "true", "yes")
+
+# columns identifying an order for ON CONFLICT and replay deduplication
+ORDER_KEY = ("order_id", "order_date") if ORDERS_PARTITIONED else ("order_id",)
+
+
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # keyset pagination on GET /orders, with and without the customer filter
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_customer_id_created_at_id", "customer_id", "created_at", "id"),
+        *(
+            (
+                UniqueConstraint(*ORDER_KEY, name="uq_orders_order_id_order_date"),
+                {"postgresql_partition_by": "RANGE (order_date)"},
+            )
+            if ORDERS_PARTITIONED
+            else ()
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
 
-    order_id = Column(String, primary_key=True, index=True, nullable=False, unique=True)
+    order_id = Column(
+        String, primary_key=not ORDERS_PARTITIONED, index=True, nullable=False, unique=not ORDERS_PARTITIONED
+    )
     customer_id = Column(String, nullable=False, index=True)
     product_id = Column(String, nullable=False, index=True)
 
@@ -29,6 +57,6 @@ class Order(Base):
     total_amount = Column(Numeric(10, 2), nullable=False)
 
     status = Column(String, nullable=False)
-    order_date = Column(DateTime, nullable=False)
+    order_date = Column(DateTime, primary_key=ORDERS_PARTITIONED, nullable=False)
 
     created_at = Column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
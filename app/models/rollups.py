@@ -0,0 +1,43 @@
+from __future__ import annotations
+from datetime import UTC, datetime
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    Numeric,
+    String,
+)
+from app.database.base import Base
+
+
+class OrderRollup(Base):
+    """Running order totals per customer, product or order day."""
+
+    __tablename__ = "order_rollups"
+
+    dimension = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+
+    order_count = Column(BigInteger, nullable=False, default=0)
+    total_quantity = Column(BigInteger, nullable=False, default=0)
+    total_revenue = Column(Numeric(18, 2), nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+
+
+class OrderRollupDelta(Base):
+    """Change log written by the orders triggers and folded into order_rollups by the compactor."""
+
+    __tablename__ = "order_rollup_deltas"
+    __table_args__ = (Index("ix_order_rollup_deltas_dimension_key", "dimension", "key"),)
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    dimension = Column(String, nullable=False)
+    key = Column(String, nullable=False)
+
+    order_count = Column(BigInteger, nullable=False)
+    total_quantity = Column(BigInteger, nullable=False)
+    total_revenue = Column(Numeric(18, 2), nullable=False)
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+
+class IngestJobResponse(BaseModel):
+    id: str
+    status: str
+    filename: Optional[str] = None
+    loader: str
+    on_conflict: str
+    chunk_size: Optional[int] = None
+
+    rows_parsed: int
+    rows_validated: int
+    rows_inserted: int
+    rows_updated: int
+    rows_skipped: int
+    rows_failed: int
+    rows_per_second: Optional[float] = None
+
+    errors: Optional[List[dict]] = None
+    error: Optional[str] = None
+
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from decimal import Decimal
+
+
+class RollupResponse(BaseModel):
+    dimension: str
+    key: str
+    order_count: int
+    total_quantity: int
+    total_revenue: Decimal
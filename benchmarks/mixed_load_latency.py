@@ -0,0 +1,89 @@
+"""
+Point-lookup latency under a concurrent heavy-read load, against a running server.
+
+Heavy readers page through GET /orders with a large limit while light readers
+hit GET /orders/{order_id}. If database work blocks the event loop, the light
+requests queue behind the heavy ones and their p99 climbs with the heavy load.
+
+    python benchmarks/mixed_load_latency.py --url http://localhost:8000 --order-id ORD-10000
+
+Run it once against the build before the change and once after, with the same
+data and arguments, and compare the reported percentiles.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def _get(url: str) -> float:
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response:
+            response.read()
+    except urllib.error.HTTPError:
+        pass
+    return time.perf_counter() - started
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(url: str, order_id: str, duration: float, heavy_workers: int, light_workers: int, heavy_limit: int) -> dict:
+    stop = time.monotonic() + duration
+    light_samples, heavy_samples = [], []
+    lock = threading.Lock()
+
+    def worker(target, samples):
+        while time.monotonic() < stop:
+            elapsed = _get(target)
+            with lock:
+                samples.append(elapsed)
+
+    threads = [
+        threading.Thread(target=worker, args=(f"{url}/orders?limit={heavy_limit}", heavy_samples))
+        for _ in range(heavy_workers)
+    ] + [
+        threading.Thread(target=worker, args=(f"{url}/orders/{order_id}", light_samples))
+        for _ in range(light_workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    def summary(samples):
+        if not samples:
+            return {"requests": 0}
+        return {
+            "requests": len(samples),
+            "throughput_rps": round(len(samples) / duration, 1),
+            "p50_ms": round(statistics.median(samples) * 1000, 2),
+            "p95_ms": round(_percentile(samples, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(samples, 0.99) * 1000, 2),
+        }
+
+    return {"point_lookup": summary(light_samples), "heavy_list": summary(heavy_samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--order-id", default="ORD-10000")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--heavy-workers", type=int, default=8)
+    parser.add_argument("--light-workers", type=int, default=8)
+    parser.add_argument("--heavy-limit", type=int, default=5000)
+    args = parser.parse_args()
+
+    result = run(args.url, args.order_id, args.duration, args.heavy_workers, args.light_workers, args.heavy_limit)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Synthetic orders that pass OrderIngest validation, for the benchmarks.
+
+Ids are drawn from a per-run base so repeated runs against the same database
+do not collide, and everything is derived from a seed so two runs of the
+same scenario send the same shapes of data.
+"""
+import csv
+import io
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Iterator
+
+CSV_HEADER = ("order_id", "customer_id", "product_id", "quantity", "price_per_unit", "order_date", "status")
+
+STATUSES = ("pending", "shipped", "completed", "cancelled")
+
+
+class OrderGenerator:
+    def __init__(self, seed: int = 42, customers: int = 10_000, products: int = 2_000, id_base: int = None):
+        self._random = random.Random(seed)
+        self._customers = customers
+        self._products = products
+        # ten digits of wall clock keep ids unique across runs and above the 5 digit minimum
+        self._next_id = id_base if id_base is not None else int(time.time()) * 10_000_000
+        self._start = datetime(2024, 1, 1)
+
+    def order(self) -> dict:
+        self._next_id += 1
+        rng = self._random
+        return {
+            "order_id": f"ORD-{self._next_id}",
+            "customer_id": f"CUST-{rng.randrange(self._customers):05d}",
+            "product_id": f"PROD-{rng.randrange(self._products):05d}",
+            "quantity": rng.randint(1, 20),
+            "price_per_unit": str(Decimal(rng.randint(100, 99_999)) / 100),
+            "order_date": (self._start + timedelta(seconds=rng.randrange(365 * 86400))).isoformat(),
+            "status": rng.choice(STATUSES),
+        }
+
+    def orders(self, count: int) -> Iterator[dict]:
+        for _ in range(count):
+            yield self.order()
+
+    def write_csv(self, stream, count: int):
+        text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        writer.writerow(CSV_HEADER)
+        for order in self.orders(count):
+            writer.writerow([order[column] for column in CSV_HEADER])
+        text.flush()
+        text.detach()
+
+    def ndjson_lines(self, count: int) -> Iterator[bytes]:
+        for order in self.orders(count):
+            yield json.dumps(order).encode() + b"\n"
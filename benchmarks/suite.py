@@ -0,0 +1,330 @@
+"""
+Benchmark suite for the ingestion API.
+
+Drives the API either in-process through the ASGI app (--target asgi, needs
+DATABASE_URL pointing at PostgreSQL, the app is imported and started here)
+or over HTTP against a running server (--target http --url ...). Scenarios:
+
+    create_order      POST /orders, one order per request
+    ingest_csv_1k     POST /ingest with a 1,000 row CSV upload
+    ingest_csv_100k   POST /ingest with 100,000 rows
+    ingest_csv_1m     POST /ingest with 1,000,000 rows (not in the default set)
+    point_lookup      GET /orders/{order_id} for orders created by earlier scenarios
+    list_orders_cursor  GET /orders walked page by page with the keyset cursor
+    list_orders_offset  the same walk with skip/limit, to show how deep offsets degrade
+    mixed             concurrent creates, lookups and page reads
+
+Results (throughput, p50/p95/p99 latency, peak RSS) are printed as JSON;
+save them with --output and pass a previous file to --compare to see the
+change per metric:
+
+    python -m benchmarks.suite --target asgi --output before.json
+    python -m benchmarks.suite --target asgi --output after.json --compare before.json
+
+PostgreSQL stand-in: `docker compose up db` starts the same postgres:16 the
+app uses, on localhost:5433.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from benchmarks.orders import OrderGenerator
+from benchmarks.transport import AsgiTransport, HttpTransport, multipart_upload
+
+
+DEFAULT_SCENARIOS = ("create_order", "ingest_csv_1k", "ingest_csv_100k", "point_lookup", "list_orders_cursor", "list_orders_offset", "mixed")
+
+# order ids kept from the write scenarios for the read scenarios to look up
+KNOWN_ID_SAMPLE = 10_000
+
+# metrics shown by --compare, and whether a higher value is better
+COMPARED_METRICS = {
+    "throughput_rps": True,
+    "rows_per_second": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "peak_rss_mb": False,
+}
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples: List[float], elapsed: float, errors: int = 0) -> dict:
+    if not samples:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(_percentile(samples, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(samples, 0.99) * 1000, 2),
+    }
+
+
+def _proc_status(pid: int, field: str) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def reset_peak_rss(pid: int):
+    # Linux only: writing 5 to clear_refs resets VmHWM, so each scenario reports its own peak
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    kilobytes = _proc_status(pid, "VmHWM")
+    return round(kilobytes / 1024, 1) if kilobytes is not None else None
+
+
+class Bench:
+    def __init__(self, transport, generator: OrderGenerator, concurrency: int, requests: int, duration: float):
+        self.transport = transport
+        self.generator = generator
+        self.concurrency = concurrency
+        self.requests = requests
+        self.duration = duration
+        self.known_ids: List[str] = []
+        self._seen = 0
+
+    def remember(self, order_id: str):
+        # reservoir sample, so lookups spread over everything written so far
+        self._seen += 1
+        if len(self.known_ids) < KNOWN_ID_SAMPLE:
+            self.known_ids.append(order_id)
+        else:
+            slot = random.randrange(self._seen)
+            if slot < KNOWN_ID_SAMPLE:
+                self.known_ids[slot] = order_id
+
+    async def drive(self, operation: Callable[[], Awaitable[bool]], count: Optional[int] = None) -> dict:
+        """Run operation from `concurrency` workers, count times in total or for the configured duration."""
+        samples: List[float] = []
+        errors = 0
+        remaining = count
+        deadline = time.monotonic() + self.duration
+
+        async def worker():
+            nonlocal remaining, errors
+            while (remaining is None and time.monotonic() < deadline) or (remaining is not None and remaining > 0):
+                if remaining is not None:
+                    remaining -= 1
+                started = time.perf_counter()
+                ok = await operation()
+                samples.append(time.perf_counter() - started)
+                errors += not ok
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return summarize(samples, time.perf_counter() - started, errors)
+
+    # -- operations ----------------------------------------------------------
+
+    async def create_one(self) -> bool:
+        order = self.generator.order()
+        response = await self.transport.request(
+            "POST", "/orders", json.dumps(order).encode(), {"content-type": "application/json"}
+        )
+        if response.status < 300:
+            self.remember(order["order_id"])
+        return response.status < 300
+
+    async def lookup_one(self) -> bool:
+        response = await self.transport.request("GET", f"/orders/{random.choice(self.known_ids)}")
+        return response.status == 200
+
+    async def page_walk(self, pages: int, offset: bool = False, limit: int = 100) -> List[float]:
+        samples = []
+        cursor = None
+        for page in range(pages):
+            if offset:
+                path = f"/orders?limit={limit}&skip={page * limit}"
+            else:
+                path = f"/orders?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+            started = time.perf_counter()
+            response = await self.transport.request("GET", path)
+            samples.append(time.perf_counter() - started)
+            cursor = response.headers.get("x-next-cursor")
+            if response.status != 200 or response.body == b"[]" or not (offset or cursor):
+                break
+        return samples
+
+    # -- scenarios -----------------------------------------------------------
+
+    async def create_order(self) -> dict:
+        return await self.drive(self.create_one, self.requests)
+
+    async def ingest_csv(self, rows: int) -> dict:
+        with tempfile.TemporaryFile() as csv_file:
+            self.generator.write_csv(csv_file, rows)
+            body, content_type = multipart_upload(csv_file)
+
+        with body:
+            started = time.perf_counter()
+            response = await self.transport.request(
+                "POST", "/ingest?loader=copy&on_conflict=skip", body, {"content-type": content_type}
+            )
+            elapsed = time.perf_counter() - started
+
+        if response.status != 200:
+            return {"status": response.status, "rows": rows, "error": response.body.decode(errors="replace")[:500]}
+        result = json.loads(response.body)
+        return {
+            "status": response.status,
+            "rows": rows,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed, 1),
+            "inserted": result.get("inserted"),
+            "failed": result.get("failed"),
+        }
+
+    async def point_lookup(self) -> dict:
+        if not self.known_ids:
+            return {"skipped": "no orders written by earlier scenarios"}
+        return await self.drive(self.lookup_one, self.requests)
+
+    async def list_orders(self, offset: bool) -> dict:
+        pages = self.requests // self.concurrency or 1
+        started = time.perf_counter()
+        walks = await asyncio.gather(*(self.page_walk(pages, offset) for _ in range(self.concurrency)))
+        samples = [sample for walk in walks for sample in walk]
+        return summarize(samples, time.perf_counter() - started)
+
+    async def mixed(self) -> dict:
+        if not self.known_ids:
+            await self.create_order()
+
+        # one worker in four writes, the rest read, like a typical dashboard-plus-ingest load
+        async def operation() -> bool:
+            roll = random.random()
+            if roll < 0.25:
+                return await self.create_one()
+            if roll < 0.9:
+                return await self.lookup_one()
+            return bool(await self.page_walk(1))
+
+        return await self.drive(operation)
+
+
+async def run(args) -> dict:
+    if args.target == "asgi":
+        from app.main import app
+
+        transport = AsgiTransport(app)
+        rss_pid = os.getpid()
+    else:
+        transport = HttpTransport(args.url)
+        rss_pid = args.server_pid
+
+    bench = Bench(transport, OrderGenerator(seed=args.seed), args.concurrency, args.requests, args.duration)
+    scenarios: Dict[str, Callable[[], Awaitable[dict]]] = {
+        "create_order": bench.create_order,
+        "ingest_csv_1k": lambda: bench.ingest_csv(1_000),
+        "ingest_csv_100k": lambda: bench.ingest_csv(100_000),
+        "ingest_csv_1m": lambda: bench.ingest_csv(1_000_000),
+        "point_lookup": bench.point_lookup,
+        "list_orders_cursor": lambda: bench.list_orders(offset=False),
+        "list_orders_offset": lambda: bench.list_orders(offset=True),
+        "mixed": bench.mixed,
+    }
+    unknown = set(args.scenarios) - set(scenarios)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    await transport.start()
+    results = {}
+    try:
+        for name in args.scenarios:
+            if rss_pid:
+                reset_peak_rss(rss_pid)
+            result = await scenarios[name]()
+            if rss_pid:
+                result["peak_rss_mb"] = peak_rss_mb(rss_pid)
+            results[name] = result
+            print(f"{name}: {json.dumps(result)}", file=sys.stderr)
+    finally:
+        await transport.stop()
+
+    return {"meta": _meta(args), "scenarios": results}
+
+
+def _meta(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "target": args.target,
+        "url": args.url if args.target == "http" else None,
+        "commit": commit or None,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "duration": args.duration,
+        "seed": args.seed,
+    }
+
+
+def compare(current: dict, baseline: dict) -> List[str]:
+    lines = []
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name, {})
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if metric not in result or not before.get(metric) or result[metric] is None:
+                continue
+            change = (result[metric] - before[metric]) / before[metric] * 100
+            better = (change > 0) == higher_is_better
+            verdict = "better" if better else "worse"
+            lines.append(f"{name:18} {metric:16} {before[metric]:>12} -> {result[metric]:>12} {change:+7.1f}% {verdict}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("asgi", "http"), default="asgi")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--server-pid", type=int, help="pid of the server, to report its peak RSS with --target http")
+    parser.add_argument("--scenarios", nargs="+", default=list(DEFAULT_SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per count-based scenario")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds for the mixed scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here as well")
+    parser.add_argument("--compare", help="previous JSON report to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
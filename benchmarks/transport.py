@@ -0,0 +1,150 @@
+"""
+Two ways to send requests to the API with the same interface: in-process
+through the ASGI app (no sockets, measures the application alone) and over
+HTTP against a running server (adds uvicorn and the network). Stdlib only.
+"""
+import asyncio
+import io
+import shutil
+import tempfile
+import urllib.error
+import urllib.request
+import uuid
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+
+Body = Union[bytes, BinaryIO, None]
+
+CHUNK_SIZE = 64 * 1024
+
+
+class Response:
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+def multipart_upload(csv_file: BinaryIO, filename: str = "orders.csv") -> Tuple[BinaryIO, str]:
+    """Wrap a CSV file as a multipart/form-data body on disk, so large uploads are never held in memory."""
+    boundary = uuid.uuid4().hex
+    body = tempfile.TemporaryFile()
+    body.write(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: text/csv\r\n\r\n".encode()
+    )
+    csv_file.seek(0)
+    shutil.copyfileobj(csv_file, body, CHUNK_SIZE)
+    body.write(f"\r\n--{boundary}--\r\n".encode())
+    body.seek(0)
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _body_length(body: Body) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, bytes):
+        return len(body)
+    position = body.tell()
+    length = body.seek(0, io.SEEK_END) - position
+    body.seek(position)
+    return length
+
+
+class AsgiTransport:
+    def __init__(self, app):
+        self.app = app
+        self._lifespan: Optional[asyncio.Task] = None
+        self._lifespan_queue: asyncio.Queue = asyncio.Queue()
+        self._lifespan_events: asyncio.Queue = asyncio.Queue()
+
+    async def start(self):
+        async def receive():
+            return await self._lifespan_queue.get()
+
+        async def send(message):
+            await self._lifespan_events.put(message)
+
+        self._lifespan = asyncio.create_task(self.app({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, send))
+        await self._lifespan_queue.put({"type": "lifespan.startup"})
+        message = await self._lifespan_events.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Application startup failed: {message}")
+
+    async def stop(self):
+        await self._lifespan_queue.put({"type": "lifespan.shutdown"})
+        await self._lifespan_events.get()
+        await self._lifespan
+
+    async def request(self, method: str, path: str, body: Body = None, headers: Optional[Dict[str, str]] = None) -> Response:
+        path, _, query = path.partition("?")
+        headers = dict(headers or {})
+        headers.setdefault("content-length", str(_body_length(body)))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+            "client": ("127.0.0.1", 50000),
+            "server": ("benchmark", 80),
+        }
+        stream = body if body is not None and not isinstance(body, bytes) else io.BytesIO(body or b"")
+        done = asyncio.Event()
+        status = 500
+        response_headers: Dict[str, str] = {}
+        chunks = []
+
+        async def receive():
+            nonlocal stream
+            if stream is None:
+                # the body was sent, the next thing the app can learn is that the client left
+                await done.wait()
+                return {"type": "http.disconnect"}
+            chunk = stream.read(CHUNK_SIZE)
+            more = len(chunk) == CHUNK_SIZE
+            if not more:
+                stream = None
+            return {"type": "http.request", "body": chunk, "more_body": more}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers.update((k.decode().lower(), v.decode()) for k, v in message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    done.set()
+
+        await self.app(scope, receive, send)
+        return Response(status, response_headers, b"".join(chunks))
+
+
+class HttpTransport:
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def _send(self, method: str, path: str, body: Body, headers: Dict[str, str]) -> Response:
+        headers = dict(headers or {})
+        if body is not None:
+            headers.setdefault("Content-Length", str(_body_length(body)))
+        request = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=3600) as response:
+                return Response(response.status, {k.lower(): v for k, v in response.headers.items()}, response.read())
+        except urllib.error.HTTPError as e:
+            return Response(e.code, {k.lower(): v for k, v in e.headers.items()}, e.read())
+
+    async def request(self, method: str, path: str, body: Body = None, headers: Optional[Dict[str, str]] = None) -> Response:
+        return await asyncio.to_thread(self._send, method, path, body, headers)
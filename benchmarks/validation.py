@@ -0,0 +1,203 @@
+"""
+Per-row CPU and allocation cost of the ingest validation loop, without the
+database or HTTP.
+
+Each step is timed on its own over a block of rows:
+
+    ingest          OrderIngest(**record)
+    dump            order.model_dump() (what .dict() is an alias of on pydantic 2)
+    create          OrderCreate(**fields, total_amount=...)
+    orm             Order(**fields), the ORM object the "orm" loader builds
+    validate_batch  validate_batch(records), the column-wise path /ingest uses
+
+on realistic CSV-shaped rows and on adversarial ones: very long ids,
+high-precision decimals, and a block where half the rows are invalid. It
+reports ns/row (best of --repeat runs) and, in a separate tracemalloc pass,
+the blocks and bytes allocated per row that are still live when the step's
+results are kept, plus the peak bytes per row.
+
+    python -m benchmarks.validation --rows 20000 --output before.json
+    python -m benchmarks.validation --rows 20000 --compare before.json
+
+app.models is imported for the ORM step, so DATABASE_URL has to be set, but
+nothing connects to it.
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+from pydantic import ValidationError
+
+from app.ingestion.validation import validate_batch
+from app.models.orders import Order
+from app.schemas.order import OrderCreate, OrderIngest
+from benchmarks.orders import OrderGenerator
+
+
+# a CSV reader hands every field over as a string
+def _csv_row(order: dict) -> dict:
+    return {name: str(value) for name, value in order.items()}
+
+
+def realistic(generator: OrderGenerator, count: int) -> List[dict]:
+    return [_csv_row(order) for order in generator.orders(count)]
+
+
+def long_ids(generator: OrderGenerator, count: int) -> List[dict]:
+    rows = realistic(generator, count)
+    for row in rows:
+        row["order_id"] = "ORD-" + row["order_id"][4:].rjust(256, "1")
+        row["customer_id"] = "CUST-" + row["customer_id"][5:].rjust(256, "2")
+    return rows
+
+
+def high_precision(generator: OrderGenerator, count: int) -> List[dict]:
+    rows = realistic(generator, count)
+    for row in rows:
+        row["price_per_unit"] = row["price_per_unit"] + "0123456789" * 4
+    return rows
+
+
+_BREAKAGES = (
+    ("order_id", "ORD-12"),
+    ("customer_id", "customer-1"),
+    ("quantity", "0"),
+    ("quantity", "three"),
+    ("price_per_unit", "-1.00"),
+    ("order_date", "yesterday"),
+    ("status", "lost"),
+)
+
+
+def half_invalid(generator: OrderGenerator, count: int) -> List[dict]:
+    rows = realistic(generator, count)
+    for idx in range(0, count, 2):
+        name, value = _BREAKAGES[(idx // 2) % len(_BREAKAGES)]
+        rows[idx][name] = value
+    return rows
+
+
+DATASETS = {
+    "realistic": realistic,
+    "long_ids": long_ids,
+    "high_precision": high_precision,
+    "half_invalid": half_invalid,
+}
+
+
+def _ingest(records: List[dict]) -> list:
+    out = []
+    for record in records:
+        try:
+            out.append(OrderIngest(**record))
+        except ValidationError as e:
+            out.append(e)
+    return out
+
+
+def _prepare(records: List[dict]) -> Dict[str, Callable[[], list]]:
+    """Inputs for each step, built from the rows the previous step accepts."""
+    orders = [order for order in _ingest(records) if isinstance(order, OrderIngest)]
+    fields = [order.model_dump() for order in orders]
+    for values in fields:
+        values["total_amount"] = Decimal(values["quantity"]) * values["price_per_unit"]
+    return {
+        "ingest": lambda: _ingest(records),
+        "dump": lambda: [order.model_dump() for order in orders],
+        "create": lambda: [OrderCreate(**values) for values in fields],
+        "orm": lambda: [Order(**values) for values in fields],
+        "validate_batch": lambda: validate_batch(records).rows,
+    }
+
+
+def time_step(step: Callable[[], list], rows: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter_ns()
+        step()
+        best = min(best, time.perf_counter_ns() - started)
+    return best / rows
+
+
+def allocations(step: Callable[[], list], rows: int) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        result = step()
+        peak = tracemalloc.get_traced_memory()[1]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in diff)
+    size = sum(stat.size_diff for stat in diff)
+    del result
+    return {
+        "allocs_per_row": round(blocks / rows, 2),
+        "bytes_per_row": round(size / rows, 1),
+        "peak_bytes_per_row": round((peak - start_bytes) / rows, 1),
+    }
+
+
+def run(rows: int, repeat: int, datasets: List[str], seed: int) -> dict:
+    results = {}
+    for dataset in datasets:
+        records = DATASETS[dataset](OrderGenerator(seed=seed, id_base=10_000_000), rows)
+        steps = _prepare(records)
+        results[dataset] = {}
+        for name, step in steps.items():
+            step()  # warm up caches and lazily built validators
+            result = {"ns_per_row": round(time_step(step, rows, repeat), 1)}
+            result.update(allocations(step, rows))
+            results[dataset][name] = result
+            print(f"{dataset:15} {name:15} {json.dumps(result)}", file=sys.stderr)
+    return {"meta": {"rows": rows, "repeat": repeat, "seed": seed, "python": sys.version.split()[0]}, "results": results}
+
+
+def compare(current: dict, baseline: dict) -> List[str]:
+    lines = []
+    for dataset, steps in current["results"].items():
+        for name, result in steps.items():
+            before = baseline.get("results", {}).get(dataset, {}).get(name)
+            if not before:
+                continue
+            for metric in ("ns_per_row", "allocs_per_row"):
+                if before.get(metric):
+                    change = (result[metric] - before[metric]) / before[metric] * 100
+                    lines.append(f"{dataset:15} {name:15} {metric:15} {before[metric]:>10} -> {result[metric]:>10} {change:+7.1f}%")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=list(DATASETS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here as well")
+    parser.add_argument("--compare", help="previous JSON report to compare against")
+    args = parser.parse_args()
+
+    report = run(args.rows, args.repeat, args.datasets, args.seed)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
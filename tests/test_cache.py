@@ -0,0 +1,125 @@
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.core.cache import LRUCache, order_cache
+from app.database.invalidation import invalidate_orders
+
+
+def test_get_set_and_lru_eviction():
+    cache = LRUCache(max_entries=2, max_bytes=1024, ttl=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")
+    # b was least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+
+
+def test_byte_limit_and_oversized_values():
+    cache = LRUCache(max_entries=10, max_bytes=4, ttl=60)
+    cache.set("big", b"12345")
+    assert cache.get("big") is None
+    cache.set("a", b"12")
+    cache.set("b", b"34")
+    cache.set("c", b"5")
+    assert cache.get("a") is None
+    assert cache.get("b") == b"34"
+
+
+def test_ttl_expiry():
+    cache = LRUCache(max_entries=10, max_bytes=1024, ttl=0.01)
+    cache.set("a", b"1")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_disabled_cache():
+    cache = LRUCache(max_entries=0, max_bytes=1024, ttl=60)
+    cache.set("a", b"1")
+    assert not cache.enabled
+    assert cache.get("a") is None
+
+
+def test_set_rejected_after_invalidation_since_token():
+    cache = LRUCache(max_entries=10, max_bytes=1024, ttl=60)
+    token = cache.token()
+    cache.invalidate(["a"])
+    cache.set("a", b"stale", token)
+    assert cache.get("a") is None
+
+
+def test_set_accepted_with_token_taken_after_invalidation():
+    cache = LRUCache(max_entries=10, max_bytes=1024, ttl=60)
+    cache.invalidate(["a"])
+    token = cache.token()
+    cache.set("a", b"fresh", token)
+    assert cache.get("a") == b"fresh"
+
+
+def test_invalidating_other_keys_does_not_reject():
+    cache = LRUCache(max_entries=10, max_bytes=1024, ttl=60)
+    token = cache.token()
+    cache.invalidate(["b"])
+    cache.set("a", b"1", token)
+    assert cache.get("a") == b"1"
+
+
+def test_clear_rejects_older_tokens():
+    cache = LRUCache(max_entries=10, max_bytes=1024, ttl=60)
+    token = cache.token()
+    cache.clear()
+    cache.set("a", b"1", token)
+    assert cache.get("a") is None
+
+
+def test_evicted_tombstone_still_rejects_older_tokens():
+    cache = LRUCache(max_entries=10, max_bytes=1024, ttl=60, tombstones=2)
+    token = cache.token()
+    cache.invalidate(["a"])
+    # pushes a's tombstone out
+    cache.invalidate(["b"])
+    cache.invalidate(["c"])
+    cache.set("a", b"stale", token)
+    assert cache.get("a") is None
+
+    fresh = cache.token()
+    cache.set("a", b"fresh", fresh)
+    assert cache.get("a") == b"fresh"
+
+
+@pytest.fixture
+def cache():
+    order_cache.clear()
+    yield order_cache
+    order_cache.clear()
+
+
+def test_invalidation_waits_for_commit(sqlite_session, cache):
+    cache.set("ORD-10001", b"old")
+    with sqlite_session() as db:
+        db.execute(text("SELECT 1"))
+        invalidate_orders(db, ["ORD-10001"])
+        # a reader racing the uncommitted write still sees and may cache the old row
+        assert cache.get("ORD-10001") == b"old"
+        token = cache.token()
+        db.commit()
+        assert cache.get("ORD-10001") is None
+        # and a value it loaded before the commit is not cached afterwards
+        cache.set("ORD-10001", b"old", token)
+        assert cache.get("ORD-10001") is None
+
+
+def test_invalidation_survives_savepoint_rollback(sqlite_session, cache):
+    cache.set("ORD-10001", b"old")
+    with sqlite_session() as db:
+        db.execute(text("SELECT 1"))
+        invalidate_orders(db, ["ORD-10001"])
+        savepoint = db.begin_nested()
+        savepoint.rollback()
+        assert cache.get("ORD-10001") == b"old"
+        db.commit()
+    assert cache.get("ORD-10001") is None
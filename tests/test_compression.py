@@ -0,0 +1,74 @@
+import asyncio
+import bz2
+import gzip
+import io
+import lzma
+
+import pytest
+
+from app.ingestion.compression import aiter_decompressed, open_decompressed
+
+
+COMPRESSORS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+MEMBERS = [b"order_id,quantity\n", b"ORD-10001,1\nORD-10002,2\n" * 50, b"ORD-10003,3\n"]
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def _decompress(data: bytes, size: int, content_type=None) -> bytes:
+    async def collect():
+        return b"".join([piece async for piece in aiter_decompressed(_chunks(data, size), content_type)])
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("kind", COMPRESSORS)
+@pytest.mark.parametrize("size", [1, 7, 64, 1 << 16])
+def test_single_member(kind, size):
+    data = b"".join(MEMBERS)
+    assert _decompress(COMPRESSORS[kind](data), size) == data
+
+
+@pytest.mark.parametrize("kind", COMPRESSORS)
+def test_members_ending_on_every_chunk_edge(kind):
+    members = [COMPRESSORS[kind](member) for member in MEMBERS]
+    body = b"".join(members)
+    expected = b"".join(MEMBERS)
+    # chunk sizes that make the first member end exactly on a chunk boundary
+    first = len(members[0])
+    sizes = {size for size in range(1, first + 1) if first % size == 0}
+    sizes.add(first + len(members[1]))
+    for size in sorted(sizes):
+        assert _decompress(body, size) == expected, size
+
+
+@pytest.mark.parametrize("kind", COMPRESSORS)
+def test_members_at_every_chunk_size(kind):
+    body = b"".join(COMPRESSORS[kind](member) for member in MEMBERS)
+    expected = b"".join(MEMBERS)
+    for size in range(1, 40):
+        assert _decompress(body, size) == expected, size
+
+
+def test_uncompressed_passthrough():
+    assert _decompress(b"a,b\n1,2\n", 3) == b"a,b\n1,2\n"
+    assert _decompress(b"a", 1) == b"a"
+
+
+def test_truncated_body_raises():
+    with pytest.raises(ValueError):
+        _decompress(gzip.compress(b"x" * 1000)[:-10], 16)
+
+
+def test_content_type_hint_for_short_body():
+    assert _decompress(gzip.compress(b""), 4, "application/gzip") == b""
+
+
+@pytest.mark.parametrize("kind", COMPRESSORS)
+def test_open_decompressed_multi_member(kind):
+    body = b"".join(COMPRESSORS[kind](member) for member in MEMBERS)
+    assert open_decompressed(io.BytesIO(body)).read() == b"".join(MEMBERS)
@@ -0,0 +1,97 @@
+import json
+from contextlib import nullcontext
+from datetime import datetime
+
+import psycopg2.errors
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.ingestion import events
+from app.ingestion.events import EventBuffer
+
+
+class _Session:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def begin_nested(self):
+        return nullcontext()
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+def _rejected():
+    return REGISTRY.get_sample_value("events_dropped_total", {"reason": "rejected"}) or 0.0
+
+
+def test_transient_error_during_isolation_fails_the_flush(monkeypatch):
+    errors = [psycopg2.errors.InvalidTextRepresentation("bad payload"), psycopg2.errors.AdminShutdown("terminating")]
+
+    def copy(db, rows):
+        if errors:
+            raise errors.pop(0)
+        return len(rows), 0
+
+    monkeypatch.setattr(events, "_copy_events", copy)
+    session = _Session()
+    buffer = EventBuffer(lambda: session)
+    rejected = _rejected()
+
+    with pytest.raises(psycopg2.errors.AdminShutdown):
+        buffer._flush([("e1",), ("e2",)])
+
+    # nothing committed or counted as rejected, the flusher requeues the whole batch
+    assert session.commits == 0
+    assert _rejected() == rejected
+
+
+@pytest.fixture
+def main_client(monkeypatch):
+    # app.main creates the tables on import, there is no database here
+    monkeypatch.setattr("app.database.init_db.init_db", lambda: None)
+    from app import main
+
+    monkeypatch.setattr(main, "EVENT_BATCH_MAX_BYTES", 200)
+    offered = []
+    monkeypatch.setattr(main.event_buffer, "offer", lambda batch: offered.extend(batch) or True)
+    # no startup, nothing here touches the database
+    return TestClient(main.app), offered
+
+
+def _batch(count):
+    return [
+        {"event_type": "click", "event_id": f"E-{n}", "payload": {}, "occurred_at": datetime(2024, 1, 1).isoformat()}
+        for n in range(count)
+    ]
+
+
+def test_event_batch_within_byte_limit(main_client):
+    client, offered = main_client
+    response = client.post("/events/batch", content=json.dumps(_batch(1)))
+    assert response.status_code == 202
+    assert len(offered) == 1
+
+
+def test_oversized_event_batch_refused_before_parsing(main_client):
+    client, offered = main_client
+    response = client.post("/events/batch", content=json.dumps(_batch(10)))
+    assert response.status_code == 413
+    assert offered == []
+
+
+def test_oversized_chunked_event_batch_refused(main_client):
+    client, offered = main_client
+    body = json.dumps(_batch(10)).encode()
+    chunks = (body[i : i + 64] for i in range(0, len(body), 64))
+    response = client.post("/events/batch", content=chunks)
+    assert response.status_code == 413
+    assert offered == []
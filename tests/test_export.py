@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+from app.api import export
+
+
+def test_disconnect_waits_for_fetch_before_closing(monkeypatch):
+    fetching = threading.Event()
+    release = threading.Event()
+    closed = []
+
+    def partitions(statement, fetch_size):
+        try:
+            fetching.set()
+            release.wait(5)
+            yield [("ORD-1",)]
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(export, "_fetch_partitions", partitions)
+
+    async def consume():
+        async for _ in export.stream_orders("ndjson"):
+            pass
+
+    async def scenario():
+        task = asyncio.create_task(consume())
+        await asyncio.get_running_loop().run_in_executor(None, fetching.wait, 5)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        # the fetch is still running, closing now would fail with "generator already executing"
+        assert not closed
+        release.set()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        for _ in range(100):
+            if closed:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert closed
@@ -0,0 +1,116 @@
+import sqlite3
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.database import heartbeat
+from app.database.heartbeat import DatabaseHeartbeat
+
+
+class _Pool:
+    def __init__(self, size=5, overflow=5, checked_out=0):
+        self._size = size
+        self._max_overflow = overflow
+        self._checked_out = checked_out
+
+    def size(self):
+        return self._size
+
+    def checkedout(self):
+        return self._checked_out
+
+
+class _Connections:
+    """dedicated_connection stand-in: hands out sqlite connections, or fails while down."""
+
+    def __init__(self):
+        self.down = False
+        self.opened = []
+
+    def __call__(self):
+        if self.down:
+            raise sqlite3.OperationalError("connection refused")
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.opened.append(conn)
+        return conn
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    connections = _Connections()
+    monkeypatch.setattr(heartbeat, "dedicated_connection", connections)
+    monkeypatch.setattr(heartbeat, "engine", SimpleNamespace(pool=_Pool()))
+    return connections
+
+
+def _heartbeat():
+    return DatabaseHeartbeat(interval=1, max_age=3, max_pool_saturation=1.0)
+
+
+def _reason(hb):
+    return hb.ready(hb.status())
+
+
+def test_unknown_before_first_beat(connections):
+    hb = _heartbeat()
+    assert hb.status()["database"] == "unknown"
+    assert _reason(hb) == "database not reached yet"
+
+
+def test_ready_after_successful_beat(connections):
+    hb = _heartbeat()
+    hb.beat()
+    status = hb.status()
+    assert status["database"] == "healthy"
+    assert status["latency_ms"] is not None
+    assert hb.ready(status) is None
+
+
+def test_failed_beat(connections):
+    connections.down = True
+    hb = _heartbeat()
+    hb.beat()
+    assert hb.status()["database"] == "unhealthy"
+    assert _reason(hb) == "database heartbeat failed: connection refused"
+
+
+def test_stale_last_success(connections):
+    hb = _heartbeat()
+    hb.beat()
+    # a hung beat records nothing, only the age of the last success grows
+    hb._last_success = time.monotonic() - 10
+    assert _reason(hb).startswith("last successful database heartbeat 10.")
+
+
+def test_saturated_pool(connections, monkeypatch):
+    monkeypatch.setattr(heartbeat, "engine", SimpleNamespace(pool=_Pool(size=5, overflow=5, checked_out=10)))
+    hb = _heartbeat()
+    hb.beat()
+    assert hb.status()["pool"]["saturation"] == 1.0
+    assert _reason(hb) == "connection pool saturated"
+
+
+def test_reconnects_after_failed_beat(connections):
+    hb = _heartbeat()
+    hb.beat()
+    first = hb._conn
+    # the open connection breaks, then the database is back
+    first.close()
+    hb.beat()
+    assert hb.healthy is False and hb._conn is None
+
+    hb.beat()
+    assert hb.healthy is True
+    assert hb._conn is not first
+    assert len(connections.opened) == 2
+    assert _reason(hb) is None
+
+
+def test_connection_reused_between_beats(connections):
+    hb = _heartbeat()
+    hb.beat()
+    hb.beat()
+    assert len(connections.opened) == 1
+    hb.stop()
+    assert hb._conn is None
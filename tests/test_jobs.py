@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from app.ingestion import jobs
+from app.models.ingest_jobs import IngestJob
+
+
+class _Recorder:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, func, *args):
+        self.submitted.append(args)
+
+
+@pytest.fixture
+def sweep(sqlite_session, tmp_path, monkeypatch):
+    IngestJob.__table__.create(sqlite_session.kw["bind"])
+    executor = _Recorder()
+    monkeypatch.setattr(jobs, "SessionLocal", sqlite_session)
+    monkeypatch.setattr(jobs, "SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(jobs, "_executor", executor)
+    return sqlite_session, tmp_path, executor
+
+
+def _add(session_factory, job_id, status, created_at=None, **values):
+    with session_factory() as db:
+        db.add(
+            IngestJob(
+                id=job_id,
+                status=status,
+                loader="copy",
+                on_conflict=values.pop("on_conflict", "error"),
+                created_at=created_at or datetime.now(UTC),
+                **values,
+            )
+        )
+        db.commit()
+
+
+def _status(session_factory, job_id):
+    with session_factory() as db:
+        return db.get(IngestJob, job_id).status
+
+
+def test_recover_jobs(sweep):
+    session_factory, spool_dir, executor = sweep
+    for job_id in ("queued", "running", "chunked", "chunked-skip", "done", "nojob"):
+        (spool_dir / f"{job_id}.upload").write_bytes(b"order_id\n")
+
+    _add(session_factory, "queued", "queued")
+    _add(session_factory, "running", "running")
+    _add(session_factory, "chunked", "running", chunk_size=100)
+    _add(session_factory, "chunked-skip", "running", chunk_size=100, on_conflict="skip")
+    _add(session_factory, "done", "completed")
+    _add(session_factory, "elsewhere", "running")
+    _add(session_factory, "lost", "running", created_at=datetime.now(UTC) - timedelta(days=2))
+
+    counts = jobs.recover_jobs()
+
+    assert counts == {"resubmitted": 3, "failed": 2, "orphans_removed": 2}
+    assert sorted(args[0] for args in executor.submitted) == ["chunked-skip", "queued", "running"]
+    assert _status(session_factory, "running") == "queued"
+    assert _status(session_factory, "chunked") == "failed"
+    assert _status(session_factory, "lost") == "failed"
+    # may still be running on another replica
+    assert _status(session_factory, "elsewhere") == "running"
+    assert sorted(path.name for path in spool_dir.iterdir()) == [
+        "chunked-skip.upload",
+        "queued.upload",
+        "running.upload",
+    ]
+
+
+def test_upload_kept_when_final_status_cannot_be_recorded(sweep, monkeypatch):
+    _, spool_dir, _ = sweep
+    path = spool_dir / "job.upload"
+    path.write_bytes(b"")
+
+    def fail(job_id, **values):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(jobs, "_update_job", fail)
+    monkeypatch.setattr(jobs.time, "sleep", lambda seconds: None)
+    jobs.run_job("job", str(path), "copy", "error")
+    assert path.exists()
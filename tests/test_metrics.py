@@ -0,0 +1,21 @@
+from prometheus_client import REGISTRY
+
+from app.ingestion.pipeline import IngestResult, finish_ingest
+
+
+def _value(name):
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+def test_rejected_rows_do_not_count_as_failed_requests(sqlite_session):
+    result = IngestResult(total_submitted=5, inserted=3)
+    result.add_error(2, {}, "bad row")
+    result.add_error(4, {}, "bad row")
+
+    requests_before = _value("ingestion_errors_total")
+    rows_before = _value("ingestion_rows_rejected_total")
+    with sqlite_session() as db:
+        finish_ingest(db, result)
+
+    assert _value("ingestion_errors_total") == requests_before
+    assert _value("ingestion_rows_rejected_total") == rows_before + 2
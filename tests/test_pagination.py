@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from app.models.orders import Order
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    token = encode_cursor(created_at, 42)
+    assert "=" not in token
+    assert decode_cursor(token) == (created_at, 42)
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "W10", encode_cursor(datetime(2024, 1, 1), 1)[:-3]])
+def test_invalid_cursor(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+@pytest.fixture
+def orders(sqlite_session):
+    start = datetime(2024, 1, 1)
+    with sqlite_session() as db:
+        for n in range(25):
+            db.add(
+                Order(
+                    order_id=f"ORD-{10000 + n}",
+                    customer_id="CUST-00001",
+                    product_id="PROD-00001",
+                    quantity=1,
+                    price_per_unit=1,
+                    total_amount=1,
+                    status="pending",
+                    order_date=start,
+                    created_at=start + timedelta(seconds=n),
+                )
+            )
+        db.commit()
+
+
+def test_cursor_walk_visits_every_order_once(client, orders):
+    seen = []
+    cursor = None
+    while True:
+        response = client.get("/orders", params={"limit": 10, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen += [order["order_id"] for order in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert seen == [f"ORD-{10000 + n}" for n in range(25)]
+
+
+def test_last_full_page_has_no_cursor(client, orders):
+    response = client.get("/orders", params={"limit": 25})
+    assert len(response.json()) == 25
+    assert "x-next-cursor" not in response.headers
+
+
+def test_limit_zero_returns_empty_page(client, orders):
+    response = client.get("/orders", params={"limit": 0})
+    assert response.status_code == 200
+    assert response.json() == []
+    assert "x-next-cursor" not in response.headers
+
+
+@pytest.mark.parametrize("params", [{"limit": -1}, {"limit": -2}, {"skip": -1}, {"limit": MAX_PAGE_SIZE + 1}])
+def test_out_of_range_paging_rejected(client, orders, params):
+    assert client.get("/orders", params=params).status_code == 422
+
+
+def test_cursor_with_skip_rejected(client, orders):
+    cursor = encode_cursor(datetime(2024, 1, 1), 1)
+    assert client.get("/orders", params={"cursor": cursor, "skip": 5}).status_code == 400
+
+
+def test_bad_cursor_rejected(client, orders):
+    assert client.get("/orders", params={"cursor": "garbage"}).status_code == 400
@@ -0,0 +1,33 @@
+import threading
+
+from sqlalchemy.exc import PendingRollbackError, TimeoutError
+
+from app.database.periodic import PeriodicTask
+
+
+def test_errors_do_not_end_the_thread():
+    errors = [TimeoutError("QueuePool limit reached"), PendingRollbackError("rollback first"), RuntimeError("bug")]
+    calls = []
+    done = threading.Event()
+
+    def func():
+        calls.append(len(calls))
+        if errors:
+            raise errors.pop(0)
+        done.set()
+
+    task = PeriodicTask("test-task", 0.01, func)
+    task.start()
+    try:
+        assert done.wait(5)
+    finally:
+        task.stop()
+    assert len(calls) == 4
+
+
+def test_final_run_on_stop():
+    calls = []
+    task = PeriodicTask("test-task", 60, lambda: calls.append(1), final_run=True)
+    task.start()
+    task.stop()
+    assert calls == [1]
@@ -0,0 +1,98 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from app.database.pool import InstrumentedQueuePool, PoolSizer
+
+
+def _pool(size=4, overflow=2):
+    creator = lambda: sqlite3.connect(":memory:", check_same_thread=False)
+    return InstrumentedQueuePool(creator, pool_size=size, max_overflow=overflow)
+
+
+def _sizer(pool, min_connections=4, max_connections=10, target_wait=0.1, step=2):
+    return PoolSizer(SimpleNamespace(pool=pool), min_connections, max_connections, target_wait, step)
+
+
+def _record(pool, waits, peak):
+    pool._waits.extend(waits)
+    pool._peak_checked_out = peak
+
+
+def test_set_capacity_moves_overflow_only():
+    pool = _pool(size=4, overflow=2)
+    assert pool.capacity() == 6
+    pool.set_capacity(9)
+    assert (pool.size(), pool.capacity()) == (4, 9)
+    # never below the base pool size
+    pool.set_capacity(1)
+    assert pool.capacity() == 4
+
+
+def test_take_checkout_stats_resets_between_ticks():
+    pool = _pool()
+    held = [pool.connect() for _ in range(3)]
+    held.pop().close()
+
+    waits, peak = pool.take_checkout_stats()
+    assert len(waits) == 3 and peak == 3
+    # the next window starts from what is still checked out
+    assert pool.take_checkout_stats() == ([], 2)
+    for conn in held:
+        conn.close()
+
+
+def test_grows_when_waits_exceed_target():
+    pool = _pool(size=4, overflow=2)
+    _record(pool, [0.5] * 20, peak=6)
+    assert _sizer(pool).adjust() == 8
+    assert pool.capacity() == 8
+
+
+def test_growth_clamped_to_max():
+    pool = _pool(size=4, overflow=5)
+    _record(pool, [0.5] * 20, peak=9)
+    assert _sizer(pool, max_connections=10).adjust() == 10
+
+    _record(pool, [0.5] * 20, peak=10)
+    assert _sizer(pool, max_connections=10).adjust() is None
+    assert pool.capacity() == 10
+
+
+def test_shrinks_with_low_waits_and_headroom():
+    pool = _pool(size=4, overflow=6)
+    _record(pool, [0.001] * 20, peak=5)
+    assert _sizer(pool).adjust() == 8
+    assert pool.capacity() == 8
+
+
+def test_keeps_capacity_without_headroom():
+    pool = _pool(size=4, overflow=6)
+    # peak use within a step of capacity
+    _record(pool, [0.001] * 20, peak=9)
+    assert _sizer(pool).adjust() is None
+    assert pool.capacity() == 10
+
+
+def test_shrink_clamped_to_min():
+    pool = _pool(size=4, overflow=1)
+    _record(pool, [], peak=0)
+    assert _sizer(pool, min_connections=4).adjust() == 4
+
+    assert _sizer(pool, min_connections=4).adjust() is None
+    assert pool.capacity() == 4
+
+
+# the second case has one slow outlier above the 95th percentile
+@pytest.mark.parametrize("waits", [[0.05] * 20, [0.05] * 39 + [0.5]])
+def test_waits_near_target_leave_pool_alone(waits):
+    pool = _pool(size=4, overflow=4)
+    _record(pool, waits, peak=2)
+    # p95 between target/4 and target
+    assert _sizer(pool).adjust() is None
+    assert pool.capacity() == 8
+
+
+def test_other_pool_classes_are_ignored():
+    assert _sizer(SimpleNamespace()).adjust() is None
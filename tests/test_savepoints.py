@@ -0,0 +1,80 @@
+from datetime import datetime
+from decimal import Decimal
+
+import psycopg2.errors
+import pytest
+from sqlalchemy import func, select
+
+from app.ingestion.loaders import orm_load
+from app.ingestion.savepoints import load_isolating
+from app.models.orders import Order
+
+
+def _row(n):
+    return (
+        f"ORD-{10000 + n}",
+        "CUST-00001",
+        "PROD-00001",
+        1,
+        Decimal("2.50"),
+        Decimal("2.50"),
+        "pending",
+        datetime(2024, 1, 1),
+        datetime(2024, 1, 2),
+    )
+
+
+def _counting(calls):
+    def load(db, rows):
+        calls.append(len(rows))
+        return orm_load(db, rows)
+
+    return load
+
+
+def test_clean_chunk_is_a_single_load(sqlite_session):
+    calls = []
+    rows = [_row(n) for n in range(8)]
+    with sqlite_session() as db:
+        result = load_isolating(db, _counting(calls), rows, list(range(1, 9)))
+        db.commit()
+        assert db.scalar(select(func.count()).select_from(Order)) == 8
+
+    assert result == (8, 0, [])
+    assert calls == [8]
+
+
+def test_bisection_drops_only_offending_rows(sqlite_session):
+    with sqlite_session() as db:
+        orm_load(db, [_row(3), _row(6)])
+        db.commit()
+
+    calls = []
+    rows = [_row(n) for n in range(8)]
+    with sqlite_session() as db:
+        inserted, updated, errors = load_isolating(db, _counting(calls), rows, list(range(11, 19)))
+        db.commit()
+        stored = db.scalars(select(Order.order_id).order_by(Order.order_id)).all()
+
+    assert (inserted, updated) == (6, 0)
+    assert [number for number, _ in errors] == [14, 17]
+    assert all(message.startswith("database error:") for _, message in errors)
+    assert stored == [_row(n)[0] for n in range(8)]
+    # every clean half is written in one go, only the failing ones are split further
+    assert calls == [8, 4, 2, 2, 1, 1, 4, 2, 2, 1, 1]
+
+
+@pytest.mark.parametrize("error", [psycopg2.errors.DiskFull, psycopg2.errors.QueryCanceled, psycopg2.errors.ReadOnlySqlTransaction])
+def test_non_data_errors_stop_the_bisection(sqlite_session, error):
+    calls = []
+
+    def load(db, rows):
+        calls.append(len(rows))
+        raise error("server trouble")
+
+    rows = [_row(n) for n in range(8)]
+    with sqlite_session() as db:
+        with pytest.raises(error):
+            load_isolating(db, load, rows, list(range(1, 9)))
+
+    assert calls == [8]
@@ -0,0 +1,142 @@
+from datetime import UTC, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+
+from app.ingestion.loaders import naive_utc
+from app.ingestion.validation import validate_batch
+from app.schemas.order import OrderCreate, OrderIngest
+
+
+CREATED_AT = datetime(2024, 6, 1, 8, 0, 0)
+
+VALID = {
+    "order_id": "ORD-00001",
+    "customer_id": "CUST-00001",
+    "product_id": "PROD-00001",
+    "quantity": 3,
+    "price_per_unit": "19.99",
+    "order_date": "2024-05-01T10:15:00",
+    "status": "shipped",
+}
+
+
+def _with(**changes):
+    record = dict(VALID)
+    for name, value in changes.items():
+        if value is KeyError:
+            record.pop(name)
+        else:
+            record[name] = value
+    return record
+
+
+RECORDS = [
+    VALID,
+    _with(status=KeyError),
+    _with(status=None),
+    _with(quantity="7"),
+    _with(price_per_unit=5),
+    _with(price_per_unit=Decimal("0.01")),
+    _with(order_date="2024-05-01 10:15:00.123456"),
+    _with(order_date=datetime(2024, 5, 1, 10, 15)),
+    # forms the fast checks leave to the schema
+    _with(order_date="2024-05-01T10:15:00Z"),
+    _with(order_date="2024-05-01"),
+    _with(quantity=2.0),
+    _with(quantity=True),
+    _with(price_per_unit=1.5),
+    _with(price_per_unit="1e2"),
+    _with(order_id="ORD-00002\n"),
+    _with(order_id=" ORD-00002"),
+    # rejected
+    _with(order_id="ORD-12"),
+    _with(customer_id="cust-00001"),
+    _with(product_id=KeyError),
+    _with(quantity=0),
+    _with(quantity=-1),
+    _with(quantity="three"),
+    _with(price_per_unit="0"),
+    _with(price_per_unit="NaN"),
+    _with(price_per_unit=None),
+    _with(status="lost"),
+    _with(order_date="yesterday"),
+    _with(order_date="2024-13-01T00:00:00"),
+    [],
+    "not a record",
+    None,
+]
+
+
+def _expected(record):
+    order = OrderIngest.model_validate(record)
+    total = Decimal(order.quantity) * order.price_per_unit
+    return (
+        order.order_id,
+        order.customer_id,
+        order.product_id,
+        order.quantity,
+        order.price_per_unit,
+        total,
+        order.status,
+        # loaders get naive UTC, the offset is applied rather than dropped
+        naive_utc(order.order_date),
+        CREATED_AT,
+    )
+
+
+@pytest.mark.parametrize("record", RECORDS)
+def test_validate_batch_matches_schema(record):
+    result = validate_batch([record], first_row=5, created_at=CREATED_AT)
+
+    try:
+        expected = _expected(record)
+    except ValidationError:
+        assert result.rows == []
+        assert [(number, original) for number, original, _ in result.errors] == [(5, record)]
+        return
+
+    assert result.errors == []
+    assert result.row_numbers == [5]
+    assert result.rows == [expected]
+    assert [type(value) for value in result.rows[0]] == [type(value) for value in expected]
+
+
+def test_validate_batch_rows_satisfy_order_create():
+    result = validate_batch(RECORDS, created_at=CREATED_AT)
+    assert result.rows
+
+    names = ("order_id", "customer_id", "product_id", "quantity", "price_per_unit", "total_amount", "status", "order_date")
+    for row in result.rows:
+        order = OrderCreate.model_validate(dict(zip(names, row)))
+        assert order.total_amount == order.quantity * order.price_per_unit
+
+
+def test_validate_batch_keeps_row_numbers_in_mixed_blocks():
+    result = validate_batch(RECORDS, first_row=1, created_at=CREATED_AT)
+
+    accepted, rejected = [], []
+    for number, record in enumerate(RECORDS, start=1):
+        try:
+            accepted.append((number, _expected(record)))
+        except ValidationError:
+            rejected.append(number)
+
+    assert list(zip(result.row_numbers, result.rows)) == accepted
+    assert [number for number, _, _ in result.errors] == rejected
+    assert all(message for _, _, message in result.errors)
+
+
+@pytest.mark.parametrize(
+    "order_date",
+    ["2024-01-01T10:00:00+05:00", datetime(2024, 1, 1, 10, 0, tzinfo=timezone(timedelta(hours=5)))],
+)
+def test_aware_order_date_is_stored_as_naive_utc(order_date):
+    result = validate_batch([_with(order_date=order_date)], created_at=datetime(2024, 6, 1, 8, 0, tzinfo=UTC))
+
+    assert result.errors == []
+    row = result.rows[0]
+    assert row[7] == datetime(2024, 1, 1, 5, 0)
+    assert row[7].tzinfo is None
+    assert row[8] == CREATED_AT and row[8].tzinfo is None